@@ -0,0 +1,155 @@
+import smtplib
+from collections import defaultdict
+import numpy as np
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import PyMongoError
+from data_access import build_query
+from spatial import GridIndex
+
+# Subscriptions with this event type get every event at their locations
+ALL_EVENTS = "All"
+
+# Id of the newest disaster_info document already alerted, stored on each subscription
+WATERMARK_FIELD = "alert_watermark"
+
+# Metadata document holding the id up to which every event has reached every matching subscriber
+ALERTS_METADATA_ID = "alerts"
+
+ALERT_FIELDS = ['title', 'disaster_event', 'timestamp', 'url', 'Location', 'Latitude', 'Longitude']
+
+
+def ensure_subscription_indexes(subscriptions):
+    # Candidate subscribers are looked up by the locations of the new events, or have a radius
+    subscriptions.create_index('selected_locations')
+    subscriptions.create_index('radius_km', sparse=True)
+
+
+def get_watermark(subscription):
+    # Subscriptions that were never alerted start at their own creation (ObjectIds grow with time)
+    return subscription.get(WATERMARK_FIELD, subscription['_id'])
+
+
+def build_subscription_index(subscriptions):
+    # {(event, location): [subscription, ...]} over every event/location pair a subscription selected
+    index = defaultdict(list)
+    for subscription in subscriptions:
+        for event in subscription.get('selected_events') or []:
+            for location in subscription.get('selected_locations') or []:
+                index[(event, location)].append(subscription)
+    return index
+
+
+def add_match(matches, subscription, event):
+    if event['_id'] <= get_watermark(subscription):
+        return
+    match = matches.setdefault(subscription['email'], {'events': {}, 'subscriptions': set()})
+    match['events'][event['_id']] = event
+    match['subscriptions'].add(subscription['_id'])
+
+
+def match_events(index, events):
+    # {email: {'events': {_id: event}, 'subscriptions': {_id}}} for events newer than each watermark.
+    # Each event only visits the subscriptions under its own (event, location) keys.
+    matches = {}
+    for event in events:
+        location = event.get('Location')
+        for key in ((event.get('disaster_event'), location), (ALL_EVENTS, location)):
+            for subscription in index.get(key, ()):
+                add_match(matches, subscription, event)
+    return matches
+
+
+def match_nearby(subscriptions, events, matches):
+    # Add the events within each radius subscription's radius_km of its point to matches.
+    # One GridIndex over the new events, so each subscription only checks the events near it.
+    nearby = [subscription for subscription in subscriptions if subscription.get('radius_km')]
+    if not nearby:
+        return matches
+    index = GridIndex([event.get('Latitude', np.nan) for event in events],
+                      [event.get('Longitude', np.nan) for event in events])
+    for subscription in nearby:
+        lon, lat = subscription['near']['coordinates']
+        selected = set(subscription.get('selected_events') or [])
+        for position in index.radius(lat, lon, subscription['radius_km']):
+            event = events[position]
+            if ALL_EVENTS in selected or event.get('disaster_event') in selected:
+                add_match(matches, subscription, event)
+    return matches
+
+
+def get_alert_watermark(metadata):
+    doc = metadata.find_one({'_id': ALERTS_METADATA_ID}, {'watermark': 1})
+    return doc.get('watermark') if doc else None
+
+
+def initial_alert_watermark(collection, subscriptions):
+    # Before the first dispatch: the oldest subscription watermark, or the newest document when
+    # nobody is subscribed (nothing before it can ever be alerted)
+    oldest = None
+    for subscription in subscriptions.find({}, {WATERMARK_FIELD: 1}):
+        watermark = get_watermark(subscription)
+        oldest = watermark if oldest is None else min(oldest, watermark)
+    if oldest is not None:
+        return oldest
+    newest = collection.find_one({}, {'_id': 1}, sort=[('_id', DESCENDING)])
+    return newest['_id'] if newest else None
+
+
+def find_new_events(collection, since):
+    # Documents inserted after the watermark that pass the dashboard excludes, oldest first
+    query = build_query()
+    if since is not None:
+        query['_id'] = {'$gt': since}
+    return list(collection.find(query, ALERT_FIELDS).sort('_id', ASCENDING))
+
+
+def find_candidate_subscriptions(subscriptions, events):
+    # Only subscriptions for an event type of the new events that selected one of their locations
+    # or watch a radius (those are narrowed down by match_nearby)
+    locations = sorted({event['Location'] for event in events if event.get('Location')})
+    event_types = sorted({event['disaster_event'] for event in events if event.get('disaster_event')})
+    return subscriptions.find({
+        'selected_events': {'$in': event_types + [ALL_EVENTS]},
+        '$or': [{'selected_locations': {'$in': locations}}, {'radius_km': {'$gt': 0}}],
+    })
+
+
+def dispatch_alerts(collection, subscriptions, metadata, send):
+    # Match every document inserted after the alert watermark against the subscriptions and call
+    # send(email, events) once per subscriber (normally an outbox enqueue). Subscription
+    # watermarks only move after send succeeded, and the alert watermark stays below the oldest
+    # event a failed subscriber did not get, so the next run retries it (or picks up articles a
+    # failed run stored but never dispatched) and nobody gets the same event twice.
+    stats = {'events': 0, 'subscribers': 0, 'sent': 0, 'failed': 0}
+    since = get_alert_watermark(metadata)
+    if since is None:
+        since = initial_alert_watermark(collection, subscriptions)
+    events = find_new_events(collection, since)
+    stats['events'] = len(events)
+    if not events:
+        return stats
+
+    candidates = list(find_candidate_subscriptions(subscriptions, events))
+    matches = match_nearby(candidates, events, match_events(build_subscription_index(candidates), events))
+    stats['subscribers'] = len(matches)
+    undelivered = None
+    for email, match in matches.items():
+        matched = sorted(match['events'].values(), key=lambda event: event['_id'])
+        try:
+            send(email, matched)
+        except (PyMongoError, smtplib.SMTPException, OSError) as e:
+            print(f"Alert to {email} failed: {e}")
+            stats['failed'] += 1
+            undelivered = matched[0]['_id'] if undelivered is None else min(undelivered, matched[0]['_id'])
+            continue
+        subscriptions.update_many(
+            {'_id': {'$in': list(match['subscriptions'])}},
+            {'$max': {WATERMARK_FIELD: matched[-1]['_id']}}
+        )
+        stats['sent'] += 1
+
+    # Everything before the first undelivered event is done for every subscriber
+    done = [event['_id'] for event in events if undelivered is None or event['_id'] < undelivered]
+    if done:
+        metadata.update_one({'_id': ALERTS_METADATA_ID}, {'$max': {'watermark': done[-1]}}, upsert=True)
+    return stats
@@ -0,0 +1,63 @@
+from datetime import datetime
+from itertools import islice
+import pyarrow as pa
+
+# Documents decoded per cursor batch before they are turned into Arrow columns and dropped
+READ_BATCH_SIZE = 10000
+
+# Arrow type of every disaster_info field the dashboard reads; repeated strings are dictionary-encoded
+EVENT_SCHEMA = pa.schema([
+    ('title', pa.string()),
+    ('disaster_event', pa.dictionary(pa.int32(), pa.string())),
+    ('timestamp', pa.timestamp('ms', tz='UTC')),
+    ('source', pa.dictionary(pa.int32(), pa.string())),
+    ('url', pa.string()),
+    ('Location', pa.dictionary(pa.int32(), pa.string())),
+    ('Latitude', pa.float64()),
+    ('Longitude', pa.float64()),
+])
+
+
+def schema_for(fields):
+    # EVENT_SCHEMA restricted to fields, in that order; unknown fields are read as strings
+    return pa.schema([EVENT_SCHEMA.field(name) if name in EVENT_SCHEMA.names else pa.field(name, pa.string())
+                      for name in fields])
+
+
+def column_array(values, field):
+    # One typed column; values of the wrong type become nulls instead of failing the batch
+    kind = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+    if pa.types.is_floating(kind):
+        values = [float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None for v in values]
+    elif pa.types.is_timestamp(kind):
+        # pymongo returns naive UTC datetimes, which Arrow reads as UTC wall time
+        values = [v if isinstance(v, datetime) else None for v in values]
+    else:
+        values = [v if isinstance(v, str) else None for v in values]
+    array = pa.array(values, type=kind, from_pandas=True)
+    return array.dictionary_encode() if pa.types.is_dictionary(field.type) else array
+
+
+def batch_to_arrow(docs, schema):
+    return pa.RecordBatch.from_arrays([column_array([doc.get(name) for doc in docs], schema.field(name))
+                                       for name in schema.names], schema=schema)
+
+
+def find_table(collection, query, fields, batch_size=READ_BATCH_SIZE):
+    # Projected query read in large cursor batches; only one batch of dicts is alive at a time
+    schema = schema_for(fields)
+    projection = {name: 1 for name in fields}
+    projection['_id'] = 0
+    cursor = collection.find(query, projection, batch_size=batch_size)
+    batches = []
+    while True:
+        docs = list(islice(cursor, batch_size))
+        if not docs:
+            break
+        batches.append(batch_to_arrow(docs, schema))
+    return pa.Table.from_batches(batches, schema=schema).unify_dictionaries()
+
+
+def find_frame(collection, query, fields, batch_size=READ_BATCH_SIZE):
+    # DataFrame with categorical event/location/source columns and UTC timestamps
+    return find_table(collection, query, fields, batch_size).to_pandas()
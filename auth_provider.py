@@ -0,0 +1,139 @@
+import threading
+from abc import ABC, abstractmethod
+from types import SimpleNamespace
+
+# Credential fields of a Firebase service account, as stored under [firebase] in secrets.toml
+FIREBASE_CREDENTIAL_FIELDS = [
+    "type", "project_id", "private_key_id", "private_key", "client_email", "client_id",
+    "auth_uri", "token_uri", "auth_provider_x509_cert_url", "client_x509_cert_url", "universe_domain",
+]
+
+
+class InvalidEmailError(ValueError):
+    pass
+
+
+class InvalidUsernameError(ValueError):
+    pass
+
+
+class UsernameTakenError(ValueError):
+    pass
+
+
+class UserNotFoundError(LookupError):
+    pass
+
+
+class AuthProvider(ABC):
+    # get_user / get_user_by_email / create_user against some user directory. Taken usernames
+    # are remembered, so repeated checks for the same name cost nothing after the first lookup.
+    def __init__(self):
+        self.taken = set()
+        self.lock = threading.Lock()
+
+    @abstractmethod
+    def get_user(self, uid):
+        ...
+
+    @abstractmethod
+    def get_user_by_email(self, email):
+        ...
+
+    @abstractmethod
+    def _create_user(self, email, password, uid):
+        ...
+
+    def username_taken(self, uid):
+        # One direct lookup per unknown name instead of listing the whole directory.
+        # Only taken names are cached: a free name may be claimed by someone else any time.
+        with self.lock:
+            if uid in self.taken:
+                return True
+        try:
+            self.get_user(uid)
+        except UserNotFoundError:
+            return False
+        with self.lock:
+            self.taken.add(uid)
+        return True
+
+    def create_user(self, email, password, uid):
+        user = self._create_user(email, password, uid)
+        with self.lock:
+            self.taken.add(uid)
+        return user
+
+
+class FirebaseAuthProvider(AuthProvider):
+    def __init__(self, config):
+        super().__init__()
+        import firebase_admin
+        from firebase_admin import auth, credentials, exceptions
+
+        if not firebase_admin._apps:
+            cred = credentials.Certificate({field: config[field] for field in FIREBASE_CREDENTIAL_FIELDS})
+            firebase_admin.initialize_app(cred)
+        self.auth = auth
+        self.exceptions = exceptions
+
+    def get_user(self, uid):
+        try:
+            return self.auth.get_user(uid)
+        except self.auth.UserNotFoundError as e:
+            raise UserNotFoundError(uid) from e
+        except ValueError as e:
+            # The SDK validates UIDs locally (empty, longer than 128 characters)
+            raise InvalidUsernameError(uid) from e
+
+    def get_user_by_email(self, email):
+        try:
+            return self.auth.get_user_by_email(email)
+        except self.auth.UserNotFoundError as e:
+            raise UserNotFoundError(email) from e
+        except (ValueError, self.exceptions.InvalidArgumentError) as e:
+            raise InvalidEmailError(email) from e
+
+    def _create_user(self, email, password, uid):
+        try:
+            return self.auth.create_user(email=email, password=password, uid=uid)
+        except self.auth.UidAlreadyExistsError as e:
+            raise UsernameTakenError(uid) from e
+        except (ValueError, self.exceptions.InvalidArgumentError) as e:
+            # Malformed emails are rejected locally by the SDK (ValueError) or by the server
+            raise InvalidEmailError(email) from e
+
+
+class InMemoryAuthProvider(AuthProvider):
+    # Dictionary-backed stand-in for tests and local runs; users are SimpleNamespace(uid, email)
+    def __init__(self, users=()):
+        super().__init__()
+        self.users = {}
+        self.lookups = 0
+        for user in users:
+            self.users[user['uid']] = SimpleNamespace(uid=user['uid'], email=user['email'])
+
+    def get_user(self, uid):
+        self.lookups += 1
+        if not uid or len(uid) > 128:
+            raise InvalidUsernameError(uid)
+        if uid not in self.users:
+            raise UserNotFoundError(uid)
+        return self.users[uid]
+
+    def get_user_by_email(self, email):
+        self.lookups += 1
+        if not email or '@' not in email:
+            raise InvalidEmailError(email)
+        for user in self.users.values():
+            if user.email == email:
+                return user
+        raise UserNotFoundError(email)
+
+    def _create_user(self, email, password, uid):
+        if not email or '@' not in email:
+            raise InvalidEmailError(email)
+        if uid in self.users:
+            raise UsernameTakenError(uid)
+        self.users[uid] = SimpleNamespace(uid=uid, email=email)
+        return self.users[uid]
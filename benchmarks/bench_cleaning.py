@@ -0,0 +1,72 @@
+# Compare the original strftime/str.contains cleaning with cleaning.clean_frame
+# Usage: python benchmarks/bench_cleaning.py [rows ...]
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cleaning import clean_frame, compile_exclude_rules
+
+EVENTS = ['Earthquake', 'Flood', 'Tsunami', 'Hurricane', 'Wildfire', 'Tornado', 'Cyclone', 'Volcano',
+          'Drought', 'Landslide', 'Storm', 'Blizzard', 'Avalanche', 'Heatwave']
+SOURCES = ['Reuters', 'BBC News', 'Yahoo Entertainment', 'The Guardian', 'Al Jazeera', 'CNN']
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    locations = np.array([f"Place {i}" for i in range(2000)], dtype=object)
+    words = np.array(['storm', 'hits', 'angry', 'city', 'tool', 'flood', 'warning', 'residents', 'evacuate'], dtype=object)
+    titles = [' '.join(parts) + f' {i % (rows // 2 + 1)}' for i, parts in enumerate(rng.choice(words, size=(rows, 4)))]
+    paths = np.array(['news', 'world', 'politics', 'sports', 'weather'], dtype=object)
+    urls = [f"https://example.com/{p}/{i}" for i, p in enumerate(rng.choice(paths, size=rows))]
+    start = pd.Timestamp('2025-01-01', tz='UTC').value
+    return pd.DataFrame({
+        'title': titles,
+        'disaster_event': rng.choice(EVENTS, size=rows),
+        'timestamp': pd.to_datetime(start + rng.integers(0, 90 * 86_400, size=rows) * 1_000_000_000, utc=True),
+        'source': rng.choice(SOURCES, size=rows),
+        'url': urls,
+        'Location': rng.choice(locations, size=rows),
+        'Latitude': rng.uniform(-60, 70, size=rows),
+        'Longitude': rng.uniform(-180, 180, size=rows),
+    })
+
+
+def legacy_clean(df):
+    # The sequence the dashboard pages used before cleaning.py
+    df = df.drop_duplicates(subset='title')
+    df = df[~df['url'].str.lower().str.contains('politics|yahoo|sports')]
+    df = df[~df['title'].str.lower().str.contains('tool|angry')]
+    df = df.copy()
+    df['date_only'] = df['timestamp'].dt.strftime('%Y-%m-%d')
+    df.drop_duplicates(subset=['date_only', 'disaster_event', 'Location'], inplace=True)
+    df.drop(columns=['date_only'], inplace=True)
+    return df
+
+
+def measure(func, df):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(df)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 2 ** 20
+
+
+def main(sizes):
+    rules = compile_exclude_rules()
+    print(f"{'rows':>9} {'legacy s':>9} {'new s':>8} {'legacy MiB':>11} {'new MiB':>8} {'rows kept':>10}")
+    for rows in sizes:
+        df = synthetic_frame(rows)
+        old, old_time, old_peak = measure(legacy_clean, df)
+        new, new_time, new_peak = measure(lambda frame: clean_frame(frame, rules), df)
+        assert old['url'].tolist() == new['url'].tolist()
+        print(f"{rows:>9} {old_time:>9.3f} {new_time:>8.3f} {old_peak:>11.1f} {new_peak:>8.1f} {len(new):>10}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,85 @@
+# Render throughput of alert digests and signup mails: per-send f-string + MIMEMultipart
+# (as alerts.py/login.py built them) vs the precompiled templates in emails.py
+# Usage: python benchmarks/bench_emails.py [messages ...]
+import email
+import html
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from emails import ALERT, SUBSCRIPTION, SUBSCRIPTION_HTML, SUBSCRIPTION_SUBJECT, render_message
+
+SENDER = 'alerts@example.com'
+EVENTS_PER_DIGEST = 5
+
+
+def synthetic_digests(messages):
+    start = datetime(2025, 1, 1)
+    return [
+        (f"user{i}@example.com", [
+            {'_id': i * EVENTS_PER_DIGEST + j, 'title': f"Flood warning issued for district {j} & nearby <towns>",
+             'disaster_event': 'Flood', 'Location': 'Köln', 'url': f"https://example.com/news/{i}/{j}?a=1&b=2",
+             'timestamp': start + timedelta(hours=i + j)}
+            for j in range(EVENTS_PER_DIGEST)
+        ])
+        for i in range(messages)
+    ]
+
+
+def legacy_message(recipient, subject, text, body):
+    msg = MIMEMultipart('alternative')
+    msg['From'] = SENDER
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    msg.attach(MIMEText(text, 'plain'))
+    msg.attach(MIMEText(body, 'html'))
+    return msg.as_string()
+
+
+def legacy_alert(recipient, events):
+    subject = f"Disaster alert: {len(events)} new event{'s' if len(events) != 1 else ''}"
+    lines = [f"- {event.get('disaster_event')} in {event.get('Location')}: {event.get('title')}\n  {event.get('url')}"
+             for event in events]
+    text = "New events matching your subscription:\n\n" + "\n".join(lines)
+    items = "".join(
+        f"<li><strong>{html.escape(str(event.get('disaster_event')))}</strong> in {html.escape(str(event.get('Location')))}: "
+        f"<a href='{html.escape(str(event.get('url')), quote=True)}'>{html.escape(str(event.get('title')))}</a></li>"
+        for event in events
+    )
+    body = f"<html><body><p>New events matching your subscription:</p><ul>{items}</ul></body></html>"
+    return legacy_message(recipient, subject, text, body)
+
+
+def timed(func, digests):
+    started = time.perf_counter()
+    messages = [func(recipient, events) for recipient, events in digests]
+    return messages, time.perf_counter() - started
+
+
+def main(sizes):
+    print(f"{'messages':>9} {'kind':>13} {'legacy s':>9} {'new s':>7} {'legacy msg/s':>13} {'new msg/s':>10}")
+    for messages in sizes:
+        digests = synthetic_digests(messages)
+        cases = [
+            ('alert', legacy_alert, lambda recipient, events: render_message(SENDER, recipient, ALERT, events)),
+            ('subscription',
+             lambda recipient, events: legacy_message(recipient, SUBSCRIPTION_SUBJECT, "Plain text version of the email",
+                                                      SUBSCRIPTION_HTML),
+             lambda recipient, events: render_message(SENDER, recipient, SUBSCRIPTION)),
+        ]
+        for kind, legacy, new in cases:
+            _, old_time = timed(legacy, digests)
+            rendered, new_time = timed(new, digests)
+            parsed = email.message_from_string(rendered[-1])
+            assert [part.get_content_type() for part in parsed.walk()] == \
+                ['multipart/alternative', 'text/plain', 'text/html']
+            print(f"{messages:>9} {kind:>13} {old_time:>9.3f} {new_time:>7.3f} "
+                  f"{messages / old_time:>13.0f} {messages / new_time:>10.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000])
@@ -0,0 +1,48 @@
+# Import cost of each page module with python -X importtime, in a fresh interpreter per page.
+# streamlit is imported first because main.py always has it loaded; the figure is what a first
+# switch to that tab adds on top. Pass another checkout to compare: bench_imports.py [tree]
+import os
+import re
+import subprocess
+import sys
+
+PAGES = ['about', 'precaution', 'home', 'insight', 'alerts', 'login']
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_time(tree, module, runs=3):
+    # Best of a few runs: total microseconds spent importing module and everything it pulls in
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import streamlit\nimport {module}"],
+                                cwd=tree, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        entries = [(int(match.group(2)), len(match.group(3)), match.group(4))
+                   for match in LINE.finditer(result.stderr)]
+        top = min(indent for _, indent, _ in entries)
+        total = 0
+        after_streamlit = False
+        for cumulative, indent, name in entries:
+            if indent != top:
+                continue
+            if after_streamlit:
+                total += cumulative
+            elif name == 'streamlit':
+                after_streamlit = True
+        best = total if best is None else min(best, total)
+    return best, None
+
+
+def main(tree):
+    print(f"{'page':>11} {'import ms':>10}")
+    for page in PAGES:
+        micros, error = import_time(tree, page)
+        if error:
+            print(f"{page:>11} {'failed':>10}  {error}")
+        else:
+            print(f"{page:>11} {micros / 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,79 @@
+# HTML size and render time of the home map: per-marker CustomIcon vs the shared-icon fast layer
+# and the server-side count grid
+# Usage: python benchmarks/bench_map.py [points ...]
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+import folium
+from folium.plugins import MarkerCluster
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from map_layers import ICON_FILES, DEFAULT_ICON_FILE, add_marker_cluster, add_fast_marker_cluster, add_aggregate_layer
+
+# 1x1 transparent PNG standing in for the real icons (a few KB each in Resources)
+PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000001e221bc330000000049454e44ae426082"
+)
+
+
+def synthetic_frame(points, seed=0):
+    rng = np.random.default_rng(seed)
+    events = list(ICON_FILES)
+    return pd.DataFrame({
+        'title': [f"Article title number {i}" for i in range(points)],
+        'url': [f"https://example.com/news/{i}" for i in range(points)],
+        'disaster_event': rng.choice(events, size=points),
+        'Location': [f"Place {i % 500}" for i in range(points)],
+        'Latitude': rng.uniform(-60, 70, size=points),
+        'Longitude': rng.uniform(-180, 180, size=points),
+    })
+
+
+def legacy_markers(mymap, df, base_path):
+    # The loop home.py used before map_layers.py: a CustomIcon read from disk for every row
+    marker_cluster = MarkerCluster().add_to(mymap)
+    for index, row in df.iterrows():
+        custom_icon = folium.CustomIcon(
+            icon_image=os.path.join(base_path, ICON_FILES.get(row['disaster_event'], DEFAULT_ICON_FILE)),
+            icon_size=(35, 35),
+            icon_anchor=(15, 30),
+            popup_anchor=(0, -25)
+        )
+        folium.Marker(
+            location=[row['Latitude'], row['Longitude']],
+            popup=folium.Popup(f"<a href='{row['url']}' target='_blank'>{row['title']}</a>", max_width=300),
+            icon=custom_icon,
+            tooltip=f"{row['disaster_event']}, {row['Location']}"
+        ).add_to(marker_cluster)
+
+
+def render(add_layer, df, base_path):
+    started = time.perf_counter()
+    mymap = folium.Map(location=(0, 0), zoom_start=4)
+    add_layer(mymap, df, base_path)
+    html = mymap.get_root().render()
+    return time.perf_counter() - started, len(html.encode("utf-8")) / 2 ** 20
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as base_path:
+        for name in list(ICON_FILES.values()) + [DEFAULT_ICON_FILE]:
+            with open(os.path.join(base_path, name), "wb") as f:
+                f.write(PNG * 40) # roughly the size of a small icon
+
+        modes = [('legacy', legacy_markers), ('cluster', add_marker_cluster), ('fast', add_fast_marker_cluster),
+                 ('grid', add_aggregate_layer)]
+        print(f"{'points':>7} {'mode':>8} {'seconds':>8} {'HTML MiB':>9}")
+        for points in sizes:
+            df = synthetic_frame(points)
+            for name, add_layer in modes:
+                seconds, size = render(add_layer, df, base_path)
+                print(f"{points:>7} {name:>8} {seconds:>8.2f} {size:>9.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 50_000])
@@ -0,0 +1,92 @@
+# Load time and peak RSS of reading disaster_info into a DataFrame:
+#   full      pd.DataFrame(list(collection.find())), as the pages originally loaded data
+#   projected pd.DataFrame(list(cursor)) of the display fields, the previous find_events
+#   arrow     arrow_reader.find_frame, typed Arrow columns built per cursor batch
+# The cursor decodes pre-encoded BSON batches with bson.decode_all, like the driver does, so no
+# server is needed. Each mode runs in its own process so ru_maxrss is that mode's peak.
+# Usage: python benchmarks/bench_mongo_read.py [documents ...]
+import os
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+import bson
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_access import DISPLAY_FIELDS
+
+BATCH = 10000
+EVENTS = ['Earthquake', 'Flood', 'Tsunami', 'Hurricane', 'Wildfire', 'Tornado', 'Cyclone', 'Volcano']
+SOURCES = ['Reuters', 'BBC News', 'The Guardian', 'Al Jazeera', 'CNN']
+
+
+def encoded_batches(documents, fields=None, seed=0):
+    # Stored documents (with _id, GeoJSON point and NER levels) encoded as BSON, one blob per batch
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1)
+    batches = []
+    for first in range(0, documents, BATCH):
+        blob = []
+        for i in range(first, min(first + BATCH, documents)):
+            lat, lon = float(rng.uniform(-60, 70)), float(rng.uniform(-180, 180))
+            doc = {
+                '_id': bson.ObjectId(), 'title': f"Storm hits city number {i}", 'description': "x" * 120,
+                'disaster_event': EVENTS[i % len(EVENTS)], 'timestamp': start + timedelta(minutes=i),
+                'source': SOURCES[i % len(SOURCES)], 'url': f"https://example.com/news/{i}",
+                'Country': 'Country', 'Region': 'Region', 'City': f"Place {i % 2000}", 'Location': f"Place {i % 2000}",
+                'Latitude': lat, 'Longitude': lon, 'location': {'type': 'Point', 'coordinates': [lon, lat]},
+            }
+            if fields is not None:
+                doc = {key: doc[key] for key in fields}
+            blob.append(bson.encode(doc))
+        batches.append(b"".join(blob))
+    return batches
+
+
+class FakeCollection:
+    # find() yields documents batch by batch, decoding each BSON batch only when it is reached
+    def __init__(self, batches):
+        self.batches = batches
+
+    def find(self, query=None, projection=None, batch_size=None):
+        for blob in self.batches:
+            yield from bson.decode_all(blob)
+
+
+def run(mode, documents):
+    import pandas as pd
+
+    fields = None if mode == 'full' else DISPLAY_FIELDS
+    collection = FakeCollection(encoded_batches(documents, fields))
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    if mode == 'arrow':
+        from arrow_reader import find_frame
+        df = find_frame(collection, {}, DISPLAY_FIELDS)
+    else:
+        df = pd.DataFrame(list(collection.find()))
+        df = df[DISPLAY_FIELDS] if mode == 'full' else df
+        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce', utc=True)
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    assert len(df) == documents
+    print(f"{elapsed:.3f} {(peak - before) / 1024:.1f} {df.memory_usage(deep=True).sum() / 2 ** 20:.1f}")
+
+
+def main(sizes):
+    print(f"{'documents':>10} {'mode':>10} {'seconds':>8} {'peak RSS +MiB':>14} {'frame MiB':>10}")
+    for documents in sizes:
+        for mode in ('full', 'projected', 'arrow'):
+            result = subprocess.run([sys.executable, __file__, '--run', mode, str(documents)],
+                                    capture_output=True, text=True, check=True)
+            seconds, peak, frame = result.stdout.split()
+            print(f"{documents:>10} {mode:>10} {float(seconds):>8.2f} {float(peak):>14.1f} {float(frame):>10.1f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
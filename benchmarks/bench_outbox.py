@@ -0,0 +1,71 @@
+# UI latency and delivery throughput of the email outbox against a local aiosmtpd server:
+# the old connect-login-send per message vs enqueue + one pooled connection per drain
+# Usage: python benchmarks/bench_outbox.py [messages ...]   (needs aiosmtpd and mongomock)
+import os
+import smtplib
+import sys
+import time
+import mongomock
+from aiosmtpd.controller import Controller
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from emails import ALERT, SUBSCRIPTION, render_message
+from outbox import SmtpMailer, drain, enqueue_email, ensure_outbox_indexes
+
+HOST, PORT = '127.0.0.1', 8025
+SENDER = 'alerts@example.com'
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 OK'
+
+
+def direct_send(recipient):
+    # What alerts.send_email did inside the request thread
+    with smtplib.SMTP(HOST, PORT) as smtp:
+        smtp.sendmail(SENDER, recipient, render_message(SENDER, recipient, SUBSCRIPTION))
+
+
+def main(sizes):
+    handler = CountingHandler()
+    controller = Controller(handler, hostname=HOST, port=PORT)
+    controller.start()
+    try:
+        print(f"{'messages':>9} {'direct s':>9} {'enqueue s':>10} {'drain s':>8} {'msg/s':>8} {'digests':>8}")
+        for messages in sizes:
+            recipients = [f"user{i % max(1, messages // 4)}@example.com" for i in range(messages)]
+
+            started = time.perf_counter()
+            for recipient in recipients:
+                direct_send(recipient)
+            direct_time = time.perf_counter() - started
+
+            outbox = mongomock.MongoClient().db.email_outbox
+            ensure_outbox_indexes(outbox)
+            events = [{'_id': i, 'title': f"Flood {i}", 'disaster_event': 'Flood', 'Location': 'Paris',
+                       'url': f"https://example.com/{i}"} for i in range(3)]
+            started = time.perf_counter()
+            for recipient in recipients:
+                enqueue_email(outbox, recipient, ALERT, events)
+            enqueue_time = time.perf_counter() - started
+
+            before = handler.received
+            started = time.perf_counter()
+            with SmtpMailer(SENDER, host=HOST, port=PORT, use_ssl=False) as mailer:
+                stats = drain(outbox, mailer)
+            drain_time = time.perf_counter() - started
+            assert stats['sent'] == messages
+            digests = handler.received - before
+            print(f"{messages:>9} {direct_time:>9.3f} {enqueue_time:>10.3f} {drain_time:>8.3f} "
+                  f"{messages / drain_time:>8.0f} {digests:>8}")
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1_000])
@@ -0,0 +1,97 @@
+# Compare the original row-wise post-processing in datacollection.py with transform.py
+# Usage: python benchmarks/bench_postprocess.py [rows ...]
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from transform import transform_articles, join_coordinates
+
+SOURCES = ['Reuters', 'BBC News', 'The Guardian', 'Al Jazeera', 'CNN']
+
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    places = [f"Place {i}" for i in range(1000)]
+    sizes = rng.integers(0, 4, size=rows)
+    picks = rng.integers(0, len(places), size=(rows, 3))
+    return pd.DataFrame({
+        'title': [f"title {i}" for i in range(rows)],
+        'source': [{'id': None, 'name': SOURCES[i % len(SOURCES)]} for i in range(rows)],
+        'url': [f"https://example.com/{i}" for i in range(rows)],
+        'location_ner': [[places[j] for j in picks[i, :size]] for i, size in enumerate(sizes)],
+    })
+
+
+def legacy_transform(df, resolved):
+    # The row-wise sequence datacollection.py used before transform.py
+    df = df.copy()
+    df['source'] = df['source'].apply(lambda x: x['name'])
+
+    def fun(text_list):
+        country, region, city = np.nan, np.nan, np.nan
+        if isinstance(text_list, list):
+            if len(text_list) >= 1:
+                country = text_list[0]
+            if len(text_list) >= 2:
+                region = text_list[1]
+            if len(text_list) >= 3:
+                city = text_list[2]
+        return country, region, city
+
+    a = df['location_ner'].apply(fun)
+    df[['Country', 'Region', 'City']] = pd.DataFrame(a.tolist(), index=df.index)
+
+    def create_location(row):
+        if pd.notna(row['City']):
+            return row['City']
+        elif pd.notna(row['Region']):
+            return row['Region']
+        elif pd.notna(row['Country']):
+            return row['Country']
+        else:
+            return np.nan
+
+    df['Location'] = df.apply(create_location, axis=1)
+    df = df.dropna(subset=['Location']).copy()
+
+    def lookup(location):
+        value = resolved.get(location)
+        if value is None:
+            return pd.Series({'Latitude': np.nan, 'Longitude': np.nan})
+        return pd.Series({'Latitude': value[0], 'Longitude': value[1]})
+
+    coordinates = df['Location'].apply(lookup)
+    df[['Latitude', 'Longitude']] = coordinates.apply(pd.Series)
+    return df
+
+
+def vectorized_transform(df, resolved):
+    df = transform_articles(df)
+    df = df.dropna(subset=['Location'])
+    return join_coordinates(df, resolved)
+
+
+def main(sizes):
+    print(f"{'rows':>9} {'legacy s':>9} {'new s':>8} {'speedup':>8}")
+    for rows in sizes:
+        df = synthetic_frame(rows)
+        resolved = {f"Place {i}": (i / 10, -i / 10) if i % 7 else None for i in range(1000)}
+
+        started = time.perf_counter()
+        old = legacy_transform(df, resolved)
+        old_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        new = vectorized_transform(df, resolved)
+        new_time = time.perf_counter() - started
+
+        assert old['Location'].tolist() == new['Location'].tolist()
+        assert np.allclose(old['Latitude'].to_numpy(dtype=float), new['Latitude'].to_numpy(), equal_nan=True)
+        print(f"{rows:>9} {old_time:>9.3f} {new_time:>8.3f} {old_time / new_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,59 @@
+# Cost of moving the local snapshot to a new data version after an ingest run:
+#   full    write_snapshot of the whole cleaned frame, as every refresh did before
+#   append  append_snapshot of only the rows ingested since the previous version
+# Usage: python benchmarks/bench_snapshot_refresh.py [rows ...]
+import os
+import shutil
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from snapshot import append_snapshot, read_snapshot, write_snapshot
+
+EVENTS = ['Earthquake', 'Flood', 'Tsunami', 'Hurricane', 'Wildfire', 'Tornado', 'Cyclone', 'Volcano']
+DELTAS = [0, 100, 1000]
+
+
+def make_frame(rows, first=0, start='2024-01-01', seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(first, first + rows)
+    return pd.DataFrame({
+        'title': [f"Storm hits city number {i}" for i in ids],
+        'disaster_event': np.array(EVENTS)[ids % len(EVENTS)],
+        'timestamp': pd.Timestamp(start, tz='UTC') + pd.to_timedelta(np.sort(rng.integers(0, 600, rows)), unit='D'),
+        'source': 'Reuters',
+        'url': [f"https://example.com/news/{i}" for i in ids],
+        'Location': [f"Place {i % 2000}" for i in ids],
+        'Latitude': rng.uniform(-60, 70, rows),
+        'Longitude': rng.uniform(-180, 180, rows),
+    })
+
+
+def main(sizes):
+    print(f"{'rows':>9} {'new rows':>9} {'full s':>7} {'append s':>9}")
+    for rows in sizes:
+        base = make_frame(rows)
+        for count in DELTAS:
+            # New articles land in the latest days, like a real ingest run
+            delta = make_frame(count, first=rows, start=str(base['timestamp'].max().date()), seed=1)
+            directory = tempfile.mkdtemp()
+            try:
+                write_snapshot(base, 1, directory)
+                started = time.perf_counter()
+                write_snapshot(pd.concat([base, delta]), 2, directory)
+                full = time.perf_counter() - started
+
+                started = time.perf_counter()
+                append_snapshot(delta, 1, 3, directory)
+                append = time.perf_counter() - started
+                assert len(read_snapshot(3, directory=directory)) == rows + count
+            finally:
+                shutil.rmtree(directory)
+            print(f"{rows:>9} {count:>9} {full:>7.2f} {append:>9.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,65 @@
+# Radius and viewport query latency over N events: GridIndex vs a full NumPy scan of every point.
+# Events sit on a few thousand geocoded places with some jitter, like the collected articles.
+# Usage: python benchmarks/bench_spatial.py [events ...]
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from spatial import GridIndex, haversine_km, normalize_lon
+
+PLACES = 2000
+QUERIES = 200
+RADII_KM = [50, 500, 2000]
+# Viewport sizes in degrees (height, width): city, country, continent
+VIEWPORTS = [(1, 2), (10, 15), (40, 60)]
+
+
+def make_points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    place_lat = np.degrees(np.arcsin(rng.uniform(-0.85, 0.95, PLACES)))
+    place_lon = rng.uniform(-180, 180, PLACES)
+    place = rng.integers(0, PLACES, count)
+    return place_lat[place] + rng.normal(0, 0.05, count), normalize_lon(place_lon[place] + rng.normal(0, 0.05, count))
+
+
+def timed(queries, search):
+    # Median and p99 milliseconds per query, and the mean number of results
+    times, found = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        found += len(search(*query))
+        times.append((time.perf_counter() - started) * 1000)
+    return np.median(times), np.percentile(times, 99), found / len(queries)
+
+
+def main(sizes):
+    rng = np.random.default_rng(1)
+    print(f"{'events':>9} {'query':>16} {'grid ms':>8} {'p99':>6} {'scan ms':>8} {'hits':>8}")
+    for count in sizes:
+        lat, lon = make_points(count)
+        started = time.perf_counter()
+        index = GridIndex(lat, lon)
+        print(f"{count:>9} {'build':>16} {(time.perf_counter() - started) * 1000:>8.1f}")
+        # Queries centred on events, where users and viewports actually are
+        centres = rng.integers(0, count, QUERIES)
+
+        for radius_km in RADII_KM:
+            queries = [(lat[i], lon[i], radius_km) for i in centres]
+            grid = timed(queries, index.radius)
+            scan = timed(queries[:20], lambda qlat, qlon, r: np.flatnonzero(haversine_km(qlat, qlon, lat, lon) <= r))
+            print(f"{count:>9} {f'radius {radius_km} km':>16} {grid[0]:>8.3f} {grid[1]:>6.3f} {scan[0]:>8.2f} {grid[2]:>8.0f}")
+
+        for height, width in VIEWPORTS:
+            queries = [(lat[i] - height / 2, lon[i] - width / 2, lat[i] + height / 2, lon[i] + width / 2)
+                       for i in centres]
+            grid = timed(queries, index.bbox)
+            scan = timed(queries[:20], lambda s, w, n, e: np.flatnonzero(
+                (lat >= s) & (lat <= n) & (normalize_lon(lon - w) <= e - w)))
+            print(f"{count:>9} {f'bbox {height}x{width} deg':>16} {grid[0]:>8.3f} {grid[1]:>6.3f} {scan[0]:>8.2f} "
+                  f"{grid[2]:>8.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
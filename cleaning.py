@@ -0,0 +1,56 @@
+import re
+
+# numpy/pandas are imported where they are used, so pages that only need the patterns stay light
+
+# Articles matching these patterns are never shown on the dashboard
+EXCLUDE_PATTERNS = {
+    'url': 'politics|yahoo|sports',
+    'title': 'tool|angry',
+}
+
+exclude_locations = [ ] #Add Locations to exclude
+
+# Low-cardinality text columns kept as categoricals after cleaning
+CATEGORICAL_COLUMNS = ['disaster_event', 'Location', 'source']
+
+
+def compile_exclude_rules(patterns=EXCLUDE_PATTERNS, locations=exclude_locations):
+    # One precompiled, case-insensitive regex per column
+    rules = {column: re.compile(pattern, re.IGNORECASE) for column, pattern in patterns.items()}
+    if locations:
+        rules['Location'] = re.compile('^(?:' + '|'.join(map(re.escape, locations)) + ')$', re.IGNORECASE)
+    return rules
+
+
+def exclude_mask(df, rules):
+    # True for rows that match any exclude rule; a single regex pass per column
+    import numpy as np
+
+    mask = np.zeros(len(df), dtype=bool)
+    for column, regex in rules.items():
+        if column in df.columns:
+            mask |= df[column].str.contains(regex, na=False).to_numpy(dtype=bool)
+    return mask
+
+
+def day_numbers(timestamps):
+    # Days since the epoch (UTC) as int64; NaT rows share one sentinel value
+    return timestamps.values.astype('datetime64[D]').astype('int64')
+
+
+def clean_frame(df, rules):
+    # Title dedupe, exclude rules, then one event per (day, disaster_event, Location)
+    import pandas as pd
+
+    df = df.drop_duplicates(subset='title')
+    if rules:
+        df = df[~exclude_mask(df, rules)]
+
+    df = df.astype({column: 'category' for column in CATEGORICAL_COLUMNS if column in df.columns})
+
+    keys = pd.DataFrame({
+        'day': day_numbers(df['timestamp']),
+        'disaster_event': df['disaster_event'].cat.codes.to_numpy(),
+        'Location': df['Location'].cat.codes.to_numpy(),
+    })
+    return df[~keys.duplicated().to_numpy()]
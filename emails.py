@@ -0,0 +1,232 @@
+import base64
+import functools
+import html
+import re
+from email.header import Header
+from html.parser import HTMLParser
+from string import Template
+
+# Message kinds the outbox knows how to render
+WELCOME = "welcome"
+SUBSCRIPTION = "subscription"
+ALERT = "alert"
+
+WELCOME_SUBJECT = "Welcome to Geo-Spatial Visualization for Disaster Monitoring"
+WELCOME_HTML = """
+        <html>
+        <head>
+          <style>
+            h2 {
+              font-size: 20px;  /* Adjust as desired for headings */
+              font-weight: bold;
+            }
+          </style>
+        </head>
+        <body>
+          <p>Dear User,</p>
+          <p>Thank you for signing up for Geo-Spatial Visualization for Disaster Monitoring! We're thrilled to welcome you to our platform.</p>
+          <p><b>Geo-Spatial Visualization for Disaster Monitoring</b> is a cutting-edge web application designed to monitor and visualize disasters in real-time by analyzing news articles. Our mission is to provide a comprehensive overview of ongoing and past disaster events, empowering users with valuable insights and actionable information.</p>
+
+          <h2><b>Key Features:</b></h2>
+          <ol>
+            <li><b>Interactive Map Visualization:</b> Explore the geographical distribution of disaster events on our interactive map powered by Folium.</li>
+            <li><b>Advanced Filtering Options:</b> Customize your experience by filtering disaster events based on type and date range using intuitive sidebar widgets.</li>
+            <li><b>Insights and Analytics:</b> Gain valuable insights into disaster events through interactive visualizations, including charts, word clouds, and event counts over time.</li>
+            <li><b>Key Events Marquee:</b> Stay informed about recent key events with our scrolling marquee in the sidebar, complete with clickable links for more information.</li>
+            <li><b>Dynamic Updates:</b> Our application dynamically updates visualizations and data in real-time based on user-selected filters, ensuring you always have access to the latest information.</li>
+          </ol>
+            <p>We are committed to providing you with the best experience possible. Our team is continuously working to enhance the platform and add new features based on user feedback.</p>
+
+          <p>If you have any questions, feedback, or suggestions, please don't hesitate to reach out to us. We're here to support you every step of the way.</p>
+
+          <p>Best regards,</p>
+          <p>The Geo-Spatial Visualization for Disaster Monitoring Team</p>
+        </body>
+        </html>
+        """
+
+SUBSCRIPTION_SUBJECT = "Subscription Confirmation"
+SUBSCRIPTION_HTML = """
+    <html>
+    <head>
+        <style>
+            h2 {
+                font-size: 20px;
+                font-weight: bold;
+            }
+            p, li {
+                font-size: 16px;
+            }
+        </style>
+    </head>
+    <body>
+    <p>Congratulations! You are now successfully subscribed to Geospatial Visualization  for Disaster Monitoring. Thank you for choosing to stay informed and prepared in times of crisis.</p>
+    <p>As a subscriber, you will receive timely updates and alerts regarding disasters and emergencies around the world based on your preferences. Our system utilizes advanced geospatial technology to provide you with accurate and up-to-date information, helping you make informed decisions to ensure your safety and well-being.</p>
+    <p>Here's what you can expect from your subscription:</p>
+    <ol>
+        <li><strong>Real-time Alerts:</strong> Instant notifications about ongoing disasters, emergencies, and significant events worldwide.</li>
+        <li><strong>Geospatial Visualization:</strong> Interactive maps and visualizations to track disaster events and their impact in real-time.</li>
+        <li><strong>Customizable Preferences:</strong> Tailor your subscription preferences to receive alerts specific to your location, areas of interest, and types of disasters.</li>
+    </ol>
+    <p>Stay tuned for your first update, and in the meantime, feel free to explore the our platform and its features.</p>
+    <p>Thank you for joining us in our mission to enhance disaster preparedness and response through innovative geospatial technology.</p>
+    <p>Best regards,<br>The Geo-Spatial Visualization for Disaster Monitoring Team</p>
+</body>
+
+    </html>
+    """
+
+STATIC_MESSAGES = {
+    WELCOME: (WELCOME_SUBJECT, WELCOME_HTML),
+    SUBSCRIPTION: (SUBSCRIPTION_SUBJECT, SUBSCRIPTION_HTML),
+}
+
+ALERT_HTML = Template("""
+    <html>
+    <head>
+        <style>
+            p, li {
+                font-size: 16px;
+            }
+        </style>
+    </head>
+    <body>
+    <p>$count new disaster event$plural matching your subscription:</p>
+    <ul>
+$items
+    </ul>
+    <p>Best regards,<br>The Geo-Spatial Visualization for Disaster Monitoring Team</p>
+    </body>
+    </html>
+""")
+ALERT_ITEM_HTML = Template(
+    '        <li><strong>$event</strong> in $location, $date: <a href="$url">$title</a></li>'
+)
+
+ALERT_TEXT = Template("""$count new disaster event$plural matching your subscription:
+
+$items
+
+Best regards,
+The Geo-Spatial Visualization for Disaster Monitoring Team
+""")
+ALERT_ITEM_TEXT = Template("- $event in $location, $date: $title\n  $url")
+
+# Both parts are base64, which never contains "=_", so one fixed boundary is safe
+BOUNDARY = "=_geonews_alternative"
+MESSAGE = Template(
+    "From: $sender\n"
+    "To: $recipient\n"
+    "Subject: $subject\n"
+    "MIME-Version: 1.0\n"
+    f'Content-Type: multipart/alternative; boundary="{BOUNDARY}"\n'
+    "\n"
+    f"--{BOUNDARY}\n"
+    'Content-Type: text/plain; charset="utf-8"\n'
+    "Content-Transfer-Encoding: base64\n"
+    "\n"
+    "$text"
+    f"--{BOUNDARY}\n"
+    'Content-Type: text/html; charset="utf-8"\n'
+    "Content-Transfer-Encoding: base64\n"
+    "\n"
+    "$html"
+    f"--{BOUNDARY}--\n"
+)
+
+
+class TextExtractor(HTMLParser):
+    # Plain-text rendering of the static bodies: paragraphs, headings, numbered list items
+    BLOCKS = {'p', 'h1', 'h2', 'h3', 'ol', 'ul'}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.skip = 0
+        self.numbers = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('style', 'head'):
+            self.skip += 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n\n")
+            if tag in ('ol', 'ul'):
+                self.numbers.append(0 if tag == 'ol' else None)
+        elif tag == 'li':
+            if self.numbers and self.numbers[-1] is not None:
+                self.numbers[-1] += 1
+                self.parts.append(f"\n{self.numbers[-1]}. ")
+            else:
+                self.parts.append("\n- ")
+        elif tag == 'br':
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ('style', 'head'):
+            self.skip -= 1
+        elif tag in ('ol', 'ul') and self.numbers:
+            self.numbers.pop()
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.parts.append(re.sub(r"\s+", " ", data))
+
+
+def html_to_text(body):
+    parser = TextExtractor()
+    parser.feed(body)
+    lines = [line.strip() for line in "".join(parser.parts).splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines)).strip() + "\n"
+
+
+def encode_part(text):
+    return base64.encodebytes(text.encode('utf-8')).decode('ascii')
+
+
+def encode_header(value):
+    # Header injection guard plus RFC 2047 for non-ASCII subjects
+    value = re.sub(r"[\r\n]+", " ", str(value))
+    return value if value.isascii() else Header(value, 'utf-8').encode()
+
+
+@functools.lru_cache(maxsize=None)
+def static_parts(kind):
+    # Subject and encoded text/HTML of the fixed messages, built once per process
+    subject, body = STATIC_MESSAGES[kind]
+    return encode_header(subject), encode_part(html_to_text(body)), encode_part(body)
+
+
+def alert_fields(event, escape):
+    timestamp = event.get('timestamp')
+    return {
+        'event': escape(str(event.get('disaster_event', ''))),
+        'location': escape(str(event.get('Location', ''))),
+        'date': escape(timestamp.strftime('%Y-%m-%d') if hasattr(timestamp, 'strftime') else str(timestamp or '')),
+        'title': escape(str(event.get('title', ''))),
+        'url': escape(str(event.get('url', ''))),
+    }
+
+
+def render_alert(events):
+    # Subject, plain text and HTML of one recipient's digest
+    counts = {'count': len(events), 'plural': 's' if len(events) != 1 else ''}
+    subject = f"Disaster alert: {counts['count']} new event{counts['plural']}"
+    fields = [alert_fields(event, html.escape) for event in events]
+    html_body = ALERT_HTML.substitute(counts, items="\n".join(ALERT_ITEM_HTML.substitute(f) for f in fields))
+    fields = [alert_fields(event, str) for event in events]
+    text = ALERT_TEXT.substitute(counts, items="\n".join(ALERT_ITEM_TEXT.substitute(f) for f in fields))
+    return subject, text, html_body
+
+
+def render_message(sender, recipient, kind, events=None):
+    # The complete multipart/alternative message as a string, ready for smtplib.sendmail.
+    # Static kinds reuse their encoded parts; alerts only substitute into precompiled templates.
+    if kind == ALERT:
+        subject, text, html_body = render_alert(events or [])
+        subject, text, html_body = encode_header(subject), encode_part(text), encode_part(html_body)
+    elif kind in STATIC_MESSAGES:
+        subject, text, html_body = static_parts(kind)
+    else:
+        raise ValueError(f"Unknown email kind: {kind}")
+    return MESSAGE.substitute(sender=encode_header(sender), recipient=encode_header(recipient),
+                              subject=subject, text=text, html=html_body)
@@ -0,0 +1,198 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from geopy.exc import GeocoderTimedOut
+
+# Default location of the on-disk cache, next to the collector script
+GEOCODE_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "geocode_cache.sqlite3")
+
+# Locations the geocoder could not resolve are retried after this many seconds
+NEGATIVE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Number of locations kept in memory on top of the SQLite table
+LRU_SIZE = 4096
+
+# Geocoding pool settings (Nominatim's usage policy allows one request per second)
+GEOCODE_WORKERS = 4
+GEOCODE_RATE_PER_SECOND = 1.0
+GEOCODE_RETRIES = 3
+GEOCODE_BACKOFF_SECONDS = 1.0
+GEOCODE_DEADLINE_SECONDS = 30
+
+
+def normalize_location(location):
+    # "  New   York " and "new york" share one cache entry
+    return " ".join(str(location).split()).lower()
+
+
+class GeocodeCache:
+    # Persistent geocode cache: in-process LRU in front of a SQLite table in front of the geocoder.
+    # Found coordinates are kept forever, misses are kept for negative_ttl seconds.
+
+    def __init__(self, geocoder, path=GEOCODE_CACHE_PATH, negative_ttl=NEGATIVE_TTL_SECONDS,
+                 lru_size=LRU_SIZE, timeout=10):
+        self.geocoder = geocoder
+        self.negative_ttl = negative_ttl
+        self.lru_size = lru_size
+        self.timeout = timeout
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'negative_hits': 0}
+
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS geocode ("
+            " location TEXT PRIMARY KEY,"
+            " latitude REAL,"
+            " longitude REAL,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _remember(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get(self, location):
+        # Returns (found, (lat, lon) or None) without calling the geocoder
+        key = normalize_location(location)
+        now = time.time()
+        with self._lock:
+            if key in self._lru:
+                value, updated_at = self._lru[key]
+                if value is not None or now - updated_at < self.negative_ttl:
+                    self._lru.move_to_end(key)
+                    self.stats['memory_hits'] += 1
+                    if value is None:
+                        self.stats['negative_hits'] += 1
+                    return True, value
+                del self._lru[key]
+
+            row = self._conn.execute(
+                "SELECT latitude, longitude, updated_at FROM geocode WHERE location = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None
+            latitude, longitude, updated_at = row
+            value = None if latitude is None else (latitude, longitude)
+            if value is None and now - updated_at >= self.negative_ttl:
+                return False, None
+            self._remember(key, (value, updated_at))
+            self.stats['disk_hits'] += 1
+            if value is None:
+                self.stats['negative_hits'] += 1
+            return True, value
+
+    def put(self, location, value):
+        key = normalize_location(location)
+        now = time.time()
+        latitude, longitude = value if value is not None else (None, None)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO geocode (location, latitude, longitude, updated_at) VALUES (?, ?, ?, ?)",
+                (key, latitude, longitude, now),
+            )
+            self._conn.commit()
+            self._remember(key, (value, now))
+
+    def count_misses(self, count=1):
+        with self._lock:
+            self.stats['misses'] += count
+
+    def fetch(self, location, timeout=None):
+        # Geocoder call stored in the cache, without reading it first or counting a miss;
+        # geocoder exceptions (timeouts etc.) propagate and are not cached
+        location_info = self.geocoder.geocode(location, timeout=timeout or self.timeout)
+        value = (location_info.latitude, location_info.longitude) if location_info else None
+        self.put(location, value)
+        return value
+
+    def geocode(self, location, timeout=None):
+        # Cached lookup
+        found, value = self.get(location)
+        if found:
+            return value
+        self.count_misses()
+        return self.fetch(location, timeout)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TokenBucket:
+    # Thread-safe token bucket shared by the geocoding workers
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        # Blocks until a token is available; returns False if timeout runs out first
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+def resolve_locations(cache, locations, max_workers=GEOCODE_WORKERS, rate=GEOCODE_RATE_PER_SECOND,
+                      retries=GEOCODE_RETRIES, backoff=GEOCODE_BACKOFF_SECONDS,
+                      deadline=GEOCODE_DEADLINE_SECONDS):
+    # Geocode each distinct location once. Cache hits are answered inline, misses go through
+    # a bounded, rate-limited worker pool. Returns {location: (lat, lon) or None}.
+    results = {}
+    pending = []
+    for location in dict.fromkeys(locations):
+        found, value = cache.get(location)
+        if found:
+            results[location] = value
+        else:
+            pending.append(location)
+    # One miss per location, however many attempts its lookup takes
+    cache.count_misses(len(pending))
+
+    bucket = TokenBucket(rate)
+
+    def resolve(location):
+        started = time.monotonic()
+        for attempt in range(retries + 1):
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0 or not bucket.acquire(timeout=remaining):
+                break
+            try:
+                return cache.fetch(location, timeout=min(cache.timeout, remaining))
+            except GeocoderTimedOut:
+                print(f"Geocoding timed out for {location} (attempt {attempt + 1})")
+                remaining = deadline - (time.monotonic() - started)
+                time.sleep(max(0, min(backoff * 2 ** attempt, remaining)))
+            except Exception as e:
+                print(f"Error geocoding {location}: {str(e)}")
+                break
+        return None
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for location, value in zip(pending, executor.map(resolve, pending)):
+                results[location] = value
+
+    return results
@@ -0,0 +1,18 @@
+# "Near me" helpers for the pages; kept free of numpy so pages import it cheaply (see spatial.py
+# for the index itself)
+
+# Radius slider of the "near me" filters (km): min, max, default, step
+NEAR_RADIUS_KM = (50, 2000, 500, 50)
+
+
+def browser_location():
+    # (lat, lon) from the browser's geolocation API, or None until the user allowed it and the
+    # component has answered (Streamlit reruns the page when it does)
+    from streamlit_javascript import st_javascript
+
+    coords = st_javascript("""await new Promise((resolve) => navigator.geolocation.getCurrentPosition(
+        (position) => resolve([position.coords.latitude, position.coords.longitude]),
+        () => resolve(null), {maximumAge: 600000, timeout: 10000}))""")
+    if isinstance(coords, list) and len(coords) == 2:
+        return float(coords[0]), float(coords[1])
+    return None
@@ -2,14 +2,9 @@ import os
 import streamlit as st
 # from dotenv import load_dotenv
 from urllib.parse import quote_plus
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import auth
-from firebase_admin import exceptions
-import smtplib
-import ssl
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from auth_provider import FirebaseAuthProvider, InvalidEmailError, InvalidUsernameError, UsernameTakenError
+from data_access import queue_email
+from emails import WELCOME
 
 # # Load environment variables from .env
 # load_dotenv()
@@ -21,100 +16,18 @@ from email.mime.text import MIMEText
 # email_address = os.getenv("EMAIL_ADDRESS")
 # email_password = os.getenv("EMAIL_PASSWORD")
 
-# Load info from st.secrets
-username = st.secrets["MONGO_USER"]
-password = st.secrets["MONGO_PASS"]
-
-email_address = st.secrets["EMAIL_ADDRESS"]
-email_password = st.secrets["EMAIL_PASSWORD"]
-news_api_key = st.secrets["NEWSAPI_KEY"]
-
 # cred = credentials.Certificate("firebase-key.json")
 
-cred = credentials.Certificate({
-    "type": firebase_config["type"],
-    "project_id": firebase_config["project_id"],
-    "private_key_id": firebase_config["private_key_id"],
-    "private_key": firebase_config["private_key"],
-    "client_email": firebase_config["client_email"],
-    "client_id": firebase_config["client_id"],
-    "auth_uri": firebase_config["auth_uri"],
-    "token_uri": firebase_config["token_uri"],
-    "auth_provider_x509_cert_url": firebase_config["auth_provider_x509_cert_url"],
-    "client_x509_cert_url": firebase_config["client_x509_cert_url"],
-    "universe_domain": firebase_config["universe_domain"]
-})
-
-if not firebase_admin._apps:
-    firebase_admin.initialize_app(cred)
+@st.cache_resource
+def get_auth_provider():
+    # Firebase app initialised once per process from the [firebase] section of secrets.toml
+    return FirebaseAuthProvider(st.secrets["firebase"])
 
 def main():
+    auth_provider = get_auth_provider()
     st.title(':green[Welcome to Geospatial Visualization for Disaster Monitoring]')  # Use st.title for large font title
     
 
-    def send_email(email):
-
-        email_receiver = email
-        subject = "Welcome to Geo-Spatial Visualization for Disaster Monitoring"
-
-        # Create a message with HTML content
-        msg = MIMEMultipart('alternative')
-        msg['From'] = email_address
-        msg['To'] = email_receiver
-        msg['Subject'] = subject
-
-        # Plain text version (optional)
-        text_part = MIMEText("Plain text version of the email", 'plain')  # Corrected constructor call
-        msg.attach(text_part)
-        
-
-        # HTML version with bold formatting and larger headings
-        html_part = MIMEText(f"""
-        <html>
-        <head>
-          <style>
-            h2 {{
-              font-size: 20px;  /* Adjust as desired for headings */
-              font-weight: bold;
-            }}
-          </style>
-        </head>
-        <body>
-          <p>Dear User,</p>
-          <p>Thank you for signing up for Geo-Spatial Visualization for Disaster Monitoring! We're thrilled to welcome you to our platform.</p>
-          <p><b>Geo-Spatial Visualization for Disaster Monitoring</b> is a cutting-edge web application designed to monitor and visualize disasters in real-time by analyzing news articles. Our mission is to provide a comprehensive overview of ongoing and past disaster events, empowering users with valuable insights and actionable information.</p>
-
-          <h2><b>Key Features:</b></h2>
-          <ol>
-            <li><b>Interactive Map Visualization:</b> Explore the geographical distribution of disaster events on our interactive map powered by Folium.</li>
-            <li><b>Advanced Filtering Options:</b> Customize your experience by filtering disaster events based on type and date range using intuitive sidebar widgets.</li>
-            <li><b>Insights and Analytics:</b> Gain valuable insights into disaster events through interactive visualizations, including charts, word clouds, and event counts over time.</li>
-            <li><b>Key Events Marquee:</b> Stay informed about recent key events with our scrolling marquee in the sidebar, complete with clickable links for more information.</li>
-            <li><b>Dynamic Updates:</b> Our application dynamically updates visualizations and data in real-time based on user-selected filters, ensuring you always have access to the latest information.</li>
-          </ol>
-            <p>We are committed to providing you with the best experience possible. Our team is continuously working to enhance the platform and add new features based on user feedback.</p>
-
-          <p>If you have any questions, feedback, or suggestions, please don't hesitate to reach out to us. We're here to support you every step of the way.</p>
-
-          <p>Best regards,</p>
-          <p>The Geo-Spatial Visualization for Disaster Monitoring Team</p>
-        </body>
-        </html>
-        """, 'html')
-        msg.attach(html_part)
-
-        # Set Content-Type header for HTML rendering
-        msg['Content-Type'] = "text/html"
-
-        # Add SSL (layer of security)
-        context = ssl.create_default_context()
-
-        # Log in and send the email
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465, context=context) as smtp:
-            smtp.login(email_address, email_password)
-            smtp.sendmail(email_address, email_receiver, msg.as_string())
-
-
     if 'username' not in st.session_state:
         st.session_state.username = ''
     if 'useremail' not in st.session_state:
@@ -122,7 +35,7 @@ def main():
 
     def f():
         try:
-            user = auth.get_user_by_email(email)
+            user = auth_provider.get_user_by_email(email)
             st.success("Login Successful")
 
             st.session_state.username = user.uid
@@ -130,7 +43,7 @@ def main():
             st.session_state.signedout = True
             st.session_state.signout = True
 
-        except exceptions.InvalidArgumentError as e:
+        except InvalidEmailError as e:
             st.error("Invalid email address. Please enter a valid email address.")
 
         except:
@@ -164,22 +77,27 @@ def main():
                     st.error("Password must be at least 8 characters long.")
                     return  # Exit the function to prevent user creation with an invalid password
     
-                try:
-                    # Fetch all users
-                    all_users = auth.list_users()
+                if not username:
+                    st.error("Please choose a username.")
+                    return
 
-                    # Check if the UID already exists
-                    for user in all_users.users:
-                        if user.uid == username:
-                            st.error("Username already exists. Please choose a different username.")
-                            return
+                try:
+                    # Direct lookup of this one UID (cached once taken), not a scan of all users
+                    if auth_provider.username_taken(username):
+                        st.error("Username already exists. Please choose a different username.")
+                        return
 
                     # If the username is unique, proceed with user creation
-                    user = auth.create_user(email=email, password=password, uid=username)
+                    user = auth_provider.create_user(email, password, username)
                     st.success('Account created successfully! Login now to Explore...')
                     st.balloons()
-                    send_email(email)
-                except exceptions.InvalidArgumentError as e:
+                    queue_email(email, WELCOME)
+                except InvalidUsernameError:
+                    st.error("Username must be 1 to 128 characters long.")
+                except UsernameTakenError:
+                    # Claimed between the check and the create
+                    st.error("Username already exists. Please choose a different username.")
+                except InvalidEmailError as e:
                     st.error("Invalid email address. Please enter a valid email address.")
     if st.session_state.signout:
         st.text('Name: ' + st.session_state.username)
@@ -0,0 +1,201 @@
+import base64
+import functools
+import json
+import os
+import numpy as np
+import folium
+from branca.element import MacroElement
+from folium.plugins import FastMarkerCluster, MarkerCluster
+from jinja2 import Template
+
+# Icon file per disaster event type, inside the Resources folder
+ICON_FILES = {
+    "Avalanche": "avalanche.png",
+    "Blizzard": "blizzard.png",
+    "Cyclone": "cyclone.png",
+    "Drought": "drought.png",
+    "Earthquake": "earthquake.png",
+    "Flood": "flood.png",
+    "Heatwave": "heatwave.png",
+    "Hurricane": "hurricane.png",
+    "Landslide": "landslide.png",
+    "Storm": "storm.png",
+    "Tornado": "tornado.png",
+    "Tsunami": "tsunami.png",
+    "Volcano": "eruption.png",
+    "Wildfire": "wildfire.png",
+}
+DEFAULT_ICON_FILE = "default.png"
+
+ICON_SIZE = (35, 35)
+ICON_ANCHOR = (15, 30)
+POPUP_ANCHOR = (0, -25)
+
+# Above this many markers the points are sent as one compact array and built in the browser
+FAST_RENDER_THRESHOLD = 500
+
+# Above this many markers only per-cell counts are sent, one grid per zoom level
+AGGREGATE_THRESHOLD = 20000
+AGGREGATE_MIN_ZOOM = 1
+AGGREGATE_MAX_ZOOM = 10
+MAX_CELLS_PER_LEVEL = 5000
+
+
+@functools.lru_cache(maxsize=None)
+def icon_url(path):
+    # Read and base64-encode each icon once per process
+    if not os.path.isfile(path):
+        return path
+    with open(path, "rb") as f:
+        return "data:image/png;base64," + base64.b64encode(f.read()).decode("utf-8")
+
+
+def get_custom_icon_path(base_path, disaster_event):
+    return os.path.join(base_path, ICON_FILES.get(disaster_event, DEFAULT_ICON_FILE))
+
+
+def add_marker_cluster(mymap, df, base_path):
+    # One folium.Marker per row; fine for small selections
+    marker_cluster = MarkerCluster().add_to(mymap)
+    for row in df[['disaster_event', 'Location', 'title', 'url', 'Latitude', 'Longitude']].itertuples(index=False):
+        custom_icon = folium.CustomIcon(
+            icon_image=icon_url(get_custom_icon_path(base_path, row.disaster_event)),
+            icon_size=ICON_SIZE,
+            icon_anchor=ICON_ANCHOR,
+            popup_anchor=POPUP_ANCHOR
+        )
+        popup_content = f"<a href='{row.url}' target='_blank'>{row.title}</a>"
+        tooltip_content = f"{row.disaster_event}, {row.Location}"
+        folium.Marker(
+            location=[row.Latitude, row.Longitude],
+            popup=folium.Popup(popup_content, max_width=300),
+            icon=custom_icon,
+            tooltip=tooltip_content
+        ).add_to(marker_cluster)
+    return marker_cluster
+
+
+def fast_marker_callback(icons):
+    # JS callback for FastMarkerCluster: icons are defined once, rows are
+    # [lat, lon, event, location, title, url]
+    return """(function () {
+        var icons = {};
+        var urls = %s;
+        for (var event in urls) {
+            icons[event] = L.icon({iconUrl: urls[event], iconSize: %s, iconAnchor: %s, popupAnchor: %s});
+        }
+        return function (row) {
+            var marker = L.marker(new L.LatLng(row[0], row[1]), {icon: icons[row[2]] || icons[""]});
+            var link = document.createElement("a");
+            link.href = row[5];
+            link.target = "_blank";
+            link.textContent = row[4];
+            marker.bindPopup(link, {maxWidth: 300});
+            marker.bindTooltip(row[2] + ", " + row[3]);
+            return marker;
+        };
+    })()""" % (json.dumps(icons), list(ICON_SIZE), list(ICON_ANCHOR), list(POPUP_ANCHOR))
+
+
+def add_fast_marker_cluster(mymap, df, base_path):
+    # All points in one array, one shared icon per event type
+    events = [event for event in df['disaster_event'].dropna().unique()]
+    icons = {str(event): icon_url(get_custom_icon_path(base_path, event)) for event in events}
+    icons[""] = icon_url(os.path.join(base_path, DEFAULT_ICON_FILE))
+
+    columns = df[['Latitude', 'Longitude', 'disaster_event', 'Location', 'title', 'url']]
+    data = [
+        [lat, lon, str(event) if isinstance(event, str) else "", str(location), str(title), str(url)]
+        for lat, lon, event, location, title, url in columns.itertuples(index=False)
+    ]
+    return FastMarkerCluster(data, callback=fast_marker_callback(icons)).add_to(mymap)
+
+
+def grid_cell_degrees(zoom):
+    # Roughly four cells across one 256px tile at this zoom level
+    return 90.0 / 2 ** zoom
+
+
+def aggregate_points(latitudes, longitudes, cell):
+    # Bin points into a cell x cell degree grid; returns per-cell centroid and count
+    latitudes = np.asarray(latitudes, dtype='float64')
+    longitudes = np.asarray(longitudes, dtype='float64')
+    valid = np.isfinite(latitudes) & np.isfinite(longitudes)
+    latitudes, longitudes = latitudes[valid], longitudes[valid]
+
+    columns = int(np.ceil(360.0 / cell))
+    ix = np.floor((longitudes + 180.0) / cell).astype(np.int64)
+    iy = np.floor((latitudes + 90.0) / cell).astype(np.int64)
+    _, inverse, counts = np.unique(iy * columns + ix, return_inverse=True, return_counts=True)
+
+    # Centroid of the points in each cell, so circles sit where the events are
+    center_lat = np.bincount(inverse, weights=latitudes) / counts
+    center_lon = np.bincount(inverse, weights=longitudes) / counts
+    return center_lat, center_lon, counts
+
+
+def aggregate_levels(df):
+    # {zoom: [[lat, lon, count], ...]}; stops before a level would exceed MAX_CELLS_PER_LEVEL
+    levels = {}
+    for zoom in range(AGGREGATE_MIN_ZOOM, AGGREGATE_MAX_ZOOM + 1):
+        center_lat, center_lon, counts = aggregate_points(df['Latitude'], df['Longitude'], grid_cell_degrees(zoom))
+        if len(counts) > MAX_CELLS_PER_LEVEL and levels:
+            break
+        levels[zoom] = [list(cell) for cell in zip(center_lat.round(4).tolist(), center_lon.round(4).tolist(), counts.tolist())]
+    return levels
+
+
+class CountGridLayer(MacroElement):
+    # Sized circles with event counts; the browser redraws the grid for the current zoom level
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function () {
+                var map = {{ this._parent.get_name() }};
+                var levels = {{ this.levels|tojson }};
+                var zooms = Object.keys(levels).map(Number).sort(function (a, b) { return a - b; });
+                var group = L.layerGroup().addTo(map);
+
+                function draw() {
+                    var zoom = zooms[0];
+                    zooms.forEach(function (z) { if (z <= map.getZoom()) { zoom = z; } });
+                    var cells = levels[zoom];
+                    var max = 1;
+                    cells.forEach(function (cell) { max = Math.max(max, cell[2]); });
+
+                    group.clearLayers();
+                    cells.forEach(function (cell) {
+                        L.circleMarker([cell[0], cell[1]], {
+                            radius: 5 + 25 * Math.sqrt(cell[2] / max),
+                            color: "#b22222", weight: 1, fillOpacity: 0.45
+                        }).bindTooltip(cell[2] + " events").addTo(group);
+                    });
+                }
+
+                map.on("zoomend", draw);
+                draw();
+                return group;
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, levels):
+        super().__init__()
+        self._name = "CountGridLayer"
+        self.levels = levels
+
+
+def add_aggregate_layer(mymap, df, base_path=None):
+    # Payload is bounded by the number of grid cells, not the number of events
+    return CountGridLayer(aggregate_levels(df)).add_to(mymap)
+
+
+def add_event_markers(mymap, df, base_path, fast=None):
+    # Pick the rendering mode from the row count unless told otherwise:
+    # small selections drill down to real markers, very large ones only send cell counts
+    if len(df) > AGGREGATE_THRESHOLD:
+        return add_aggregate_layer(mymap, df)
+    if fast is None:
+        fast = len(df) > FAST_RENDER_THRESHOLD
+    if fast:
+        return add_fast_marker_cluster(mymap, df, base_path)
+    return add_marker_cluster(mymap, df, base_path)
@@ -0,0 +1,98 @@
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+NEWSAPI_ENDPOINT = 'https://newsapi.org/v2/everything'
+
+# NewsAPI fetch settings
+NEWSAPI_PAGE_SIZE = 100 # NewsAPI maximum
+NEWSAPI_MAX_PAGES = 5 # Page cap per keyword
+NEWSAPI_TIMEOUT = (5, 30) # (connect, read) seconds
+NEWSAPI_RETRIES = 3
+NEWSAPI_BACKOFF_SECONDS = 1.0
+NEWSAPI_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Articles from this many days back are requested
+NEWSAPI_LOOKBACK_DAYS = 15
+
+def create_session(pool_size=1):
+    # One keep-alive connection pool shared by all keyword fetches
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_with_retry(session, params, retries=NEWSAPI_RETRIES, backoff=NEWSAPI_BACKOFF_SECONDS,
+                   endpoint=NEWSAPI_ENDPOINT, timeout=NEWSAPI_TIMEOUT):
+    # GET the NewsAPI endpoint, retrying rate limits, server errors and connection failures
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(endpoint, params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == retries:
+                raise
+            print(f"NewsAPI request failed for {params['q']}: {e}")
+            time.sleep(backoff * 2 ** attempt)
+            continue
+
+        if response.status_code not in NEWSAPI_RETRY_STATUSES or attempt == retries:
+            return response
+
+        retry_after = response.headers.get('Retry-After', '')
+        delay = float(retry_after) if retry_after.isdigit() else backoff * 2 ** attempt
+        time.sleep(delay)
+
+def fetch_live_data(keyword, api_key, session=None, max_pages=NEWSAPI_MAX_PAGES, page_size=NEWSAPI_PAGE_SIZE,
+                    **request_options):
+    # Articles for one keyword over the lookback window, following pages up to max_pages.
+    # request_options (endpoint, timeout, retries, backoff) go to get_with_retry.
+    now = datetime.datetime.now()
+    params = {
+        'apiKey': api_key,
+        'q': keyword,
+        'from': (now - datetime.timedelta(days=NEWSAPI_LOOKBACK_DAYS)).strftime('%Y-%m-%d'),
+        'to': now.strftime('%Y-%m-%d'),
+        'language': 'en',
+        'pageSize': page_size,
+    }
+
+    # A session created here is closed here; a shared one belongs to the caller
+    own_session = session is None
+    session = session or create_session()
+    articles = []
+    try:
+        for page in range(1, max_pages + 1):
+            response = get_with_retry(session, dict(params, page=page), **request_options)
+            payload = response.json()
+            if response.status_code != 200 or payload.get('status') == 'error':
+                # Past the plan's result limit NewsAPI answers with an error; keep what we have
+                if page == 1:
+                    print(f"NewsAPI error for {keyword}: {payload.get('message', response.status_code)}")
+                break
+
+            page_articles = payload.get('articles', [])
+            articles.extend(page_articles)
+            if len(page_articles) < page_size or len(articles) >= payload.get('totalResults', 0):
+                break
+    finally:
+        if own_session:
+            session.close()
+
+    return articles
+
+def fetch_all_keywords(keywords, api_key, max_workers=None, **fetch_options):
+    # Fetch every keyword concurrently over one pooled session; results keep keyword order
+    max_workers = max_workers or len(keywords)
+    with create_session(pool_size=max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch_live_data, keyword, api_key, session, **fetch_options)
+                       for keyword in keywords]
+            results = {}
+            for keyword, future in zip(keywords, futures):
+                try:
+                    results[keyword] = future.result()
+                except Exception as e:
+                    print(f"Failed to fetch articles for {keyword}: {e}")
+                    results[keyword] = []
+    return results
@@ -0,0 +1,203 @@
+import smtplib
+import ssl
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING
+from emails import ALERT, render_message
+
+OUTBOX_COLLECTION_NAME = "email_outbox"
+
+# Outbox document states
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+OUTBOX_BATCH_SIZE = 200
+MAX_ATTEMPTS = 6
+RETRY_BACKOFF_SECONDS = 30
+# A batch still "sending" after this long belongs to a worker that died; it is claimed again
+CLAIM_LEASE_SECONDS = 600
+POLL_SECONDS = 5
+
+SMTP_HOST = 'smtp.gmail.com'
+SMTP_PORT = 465
+
+
+def ensure_outbox_indexes(outbox):
+    outbox.create_index([('status', ASCENDING), ('next_attempt_at', ASCENDING)])
+    outbox.create_index('claim')
+    outbox.create_index('recipient')
+
+
+def enqueue_email(outbox, recipient, kind, events=None):
+    # Durable hand-off from the UI or the ingest job; delivery happens in the worker
+    now = datetime.now(timezone.utc)
+    outbox.insert_one({
+        'recipient': recipient,
+        'kind': kind,
+        'events': events or [],
+        'status': PENDING,
+        'attempts': 0,
+        'created_at': now,
+        'next_attempt_at': now,
+    })
+
+
+def claim_due(outbox, batch_size=OUTBOX_BATCH_SIZE):
+    # Claim everything due for the next batch_size recipients with a fresh claim token, so each
+    # recipient's queued alerts end up in the same batch (and the same digest)
+    now = datetime.now(timezone.utc)
+    due = {'$or': [
+        {'status': PENDING, 'next_attempt_at': {'$lte': now}},
+        {'status': SENDING, 'claimed_at': {'$lt': now - timedelta(seconds=CLAIM_LEASE_SECONDS)}},
+    ]}
+    recipients = {}
+    for doc in outbox.find(due, {'recipient': 1}).sort('next_attempt_at', ASCENDING):
+        recipients.setdefault(doc['recipient'], None)
+        if len(recipients) >= batch_size:
+            break
+    if not recipients:
+        return []
+    claim = uuid.uuid4().hex
+    outbox.update_many({'recipient': {'$in': list(recipients)}, **due},
+                       {'$set': {'status': SENDING, 'claim': claim, 'claimed_at': now}})
+    return list(outbox.find({'claim': claim}))
+
+
+def group_messages(docs):
+    # One message per non-alert document; all alerts for a recipient become one digest
+    messages = []
+    digests = defaultdict(list)
+    for doc in docs:
+        if doc['kind'] == ALERT:
+            digests[doc['recipient']].append(doc)
+        else:
+            messages.append((doc['recipient'], doc['kind'], [], [doc['_id']]))
+    for recipient, batch in digests.items():
+        events = {}
+        for doc in batch:
+            for event in doc.get('events', []):
+                events.setdefault(event.get('_id', event.get('url')), event)
+        messages.append((recipient, ALERT, list(events.values()), [doc['_id'] for doc in batch]))
+    return messages
+
+
+def deliver_pending(outbox, mailer, batch_size=OUTBOX_BATCH_SIZE):
+    # Send one claimed batch over the mailer's connection; returns per-state counts.
+    # Delivered documents are marked sent with one write per batch (at-least-once: a crash
+    # before that write resends the batch once the claim lease expires).
+    stats = {'messages': 0, 'sent': 0, 'retry': 0, 'failed': 0}
+    docs = claim_due(outbox, batch_size)
+    attempts = {doc['_id']: doc.get('attempts', 0) for doc in docs}
+    sent = []
+    for recipient, kind, events, ids in group_messages(docs):
+        stats['messages'] += 1
+        try:
+            mailer.send(recipient, render_message(mailer.sender, recipient, kind, events))
+        except (smtplib.SMTPException, OSError, ValueError) as e:
+            for _id in ids:
+                state = mark_failed(outbox, _id, attempts[_id] + 1, e)
+                stats[state] += 1
+            continue
+        sent.extend(ids)
+
+    if sent:
+        outbox.update_many({'_id': {'$in': sent}},
+                           {'$set': {'status': SENT, 'sent_at': datetime.now(timezone.utc)}, '$unset': {'claim': ''}})
+    stats['sent'] = len(sent)
+    return stats
+
+
+def mark_failed(outbox, _id, attempts, error):
+    # Exponential backoff until MAX_ATTEMPTS, then the message is parked as failed
+    if attempts >= MAX_ATTEMPTS:
+        status, state = FAILED, 'failed'
+    else:
+        status, state = PENDING, 'retry'
+    next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    outbox.update_one({'_id': _id}, {
+        '$set': {'status': status, 'attempts': attempts, 'next_attempt_at': next_attempt_at, 'last_error': str(error)},
+        '$unset': {'claim': ''},
+    })
+    return state
+
+
+def drain(outbox, mailer, batch_size=OUTBOX_BATCH_SIZE):
+    # Deliver until nothing is due any more
+    total = {'messages': 0, 'sent': 0, 'retry': 0, 'failed': 0}
+    while True:
+        stats = deliver_pending(outbox, mailer, batch_size)
+        for key, value in stats.items():
+            total[key] += value
+        if not stats['messages']:
+            return total
+
+
+def run_worker(outbox, mailer, stop_event, poll_seconds=POLL_SECONDS):
+    # Background loop: keep the SMTP connection while there is work, drop it when idle
+    while not stop_event.is_set():
+        try:
+            stats = drain(outbox, mailer)
+        except Exception as e:
+            print(f"Email worker error: {e}")
+            stats = None
+        if not stats or not stats['messages']:
+            mailer.close()
+        stop_event.wait(poll_seconds)
+    mailer.close()
+
+
+def start_worker(outbox, mailer, poll_seconds=POLL_SECONDS):
+    # Daemon thread running run_worker; set the returned event to stop it
+    stop_event = threading.Event()
+    thread = threading.Thread(target=run_worker, args=(outbox, mailer, stop_event, poll_seconds), daemon=True,
+                              name="email-outbox")
+    thread.start()
+    return stop_event
+
+
+class SmtpMailer:
+    # One authenticated SMTP connection reused for many messages, opened on the first send.
+    # use_ssl=False and no password talk to a plain local server (python -m aiosmtpd -n).
+    def __init__(self, sender, password=None, host=SMTP_HOST, port=SMTP_PORT, use_ssl=True):
+        self.sender = sender
+        self.password = password
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self.smtp = None
+
+    def connect(self):
+        if self.use_ssl:
+            self.smtp = smtplib.SMTP_SSL(self.host, self.port, context=ssl.create_default_context())
+        else:
+            self.smtp = smtplib.SMTP(self.host, self.port)
+        if self.password:
+            self.smtp.login(self.sender, self.password)
+
+    def send(self, recipient, message):
+        if self.smtp is None:
+            self.connect()
+        try:
+            self.smtp.sendmail(self.sender, recipient, message)
+        except smtplib.SMTPServerDisconnected:
+            # Reconnect on the next send
+            self.smtp = None
+            raise
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.smtp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
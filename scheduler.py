@@ -0,0 +1,173 @@
+import argparse
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+# One status document per job: run lease, last result and pending run requests
+JOBS_COLLECTION_NAME = "jobs"
+INGEST_JOB = "ingest"
+
+# Job states
+IDLE = "idle"
+RUNNING = "running"
+
+# Results of the last finished run
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+INGEST_INTERVAL_SECONDS = 6 * 3600
+# A failed run is retried sooner than the regular interval
+RETRY_SECONDS = 900
+POLL_SECONDS = 30
+# A run whose lease is not renewed for this long belongs to a process that died; the next
+# scheduler may take the job over. The running process renews it every LEASE_SECONDS / 3.
+LEASE_SECONDS = 600
+
+
+def new_owner():
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def get_status(jobs, name=INGEST_JOB):
+    return jobs.find_one({'_id': name})
+
+
+def acquire_lease(jobs, name, owner, lease_seconds=LEASE_SECONDS):
+    # Take the job if nobody holds an unexpired lease; False when another run is in progress.
+    # The upsert creates the status document on first use; a held lease makes it a duplicate key.
+    now = datetime.now(timezone.utc)
+    free = {'$or': [{'lease_until': None}, {'lease_until': {'$lt': now}}]}
+    try:
+        jobs.update_one(
+            {'_id': name, **free},
+            {'$set': {'state': RUNNING, 'owner': owner, 'started_at': now,
+                      'lease_until': now + timedelta(seconds=lease_seconds)}},
+            upsert=True)
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+def renew_lease(jobs, name, owner, lease_seconds=LEASE_SECONDS):
+    # False when the lease was lost (expired and taken over)
+    until = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+    return jobs.update_one({'_id': name, 'owner': owner}, {'$set': {'lease_until': until}}).matched_count == 1
+
+
+def release_lease(jobs, name, owner, result, stats=None, error=None):
+    # Record the finished run and free the job
+    now = datetime.now(timezone.utc)
+    update = {'state': IDLE, 'owner': None, 'lease_until': None, 'finished_at': now,
+              'last_result': result, 'last_error': error}
+    if result == SUCCEEDED:
+        update.update({'last_success_at': now, 'stats': stats})
+    jobs.update_one({'_id': name, 'owner': owner}, {'$set': update})
+
+
+def request_run(jobs, name=INGEST_JOB):
+    # Ask the scheduler for a run at its next poll; repeated requests before that run are one request
+    jobs.update_one({'_id': name}, {'$set': {'requested_at': datetime.now(timezone.utc)}}, upsert=True)
+
+
+def keep_lease(jobs, name, owner, stop_event, lease_seconds):
+    # A failed renewal is retried at the next tick (the lease outlasts two of them); only a lease
+    # taken over by another process ends the loop
+    while not stop_event.wait(lease_seconds / 3):
+        try:
+            renewed = renew_lease(jobs, name, owner, lease_seconds)
+        except PyMongoError as e:
+            print(f"Renewing the {name} lease failed, retrying: {e}")
+            continue
+        if not renewed:
+            print(f"Lost the {name} lease")
+            return
+
+
+def run_job(jobs, name, job, owner=None, lease_seconds=LEASE_SECONDS):
+    # Run job() under the job lease, renewing it in the background, and record the outcome on the
+    # status document. Returns job()'s stats, or None when another process holds the lease.
+    owner = owner or new_owner()
+    if not acquire_lease(jobs, name, owner, lease_seconds):
+        print(f"{name} is already running elsewhere, skipped")
+        return None
+    stop_event = threading.Event()
+    threading.Thread(target=keep_lease, args=(jobs, name, owner, stop_event, lease_seconds), daemon=True,
+                     name=f"{name}-lease").start()
+    try:
+        stats = job()
+    except Exception as e:
+        release_lease(jobs, name, owner, FAILED, error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        stop_event.set()
+    release_lease(jobs, name, owner, SUCCEEDED, stats)
+    return stats
+
+
+def as_utc(value):
+    # pymongo returns naive UTC datetimes
+    return value.replace(tzinfo=timezone.utc) if value is not None and value.tzinfo is None else value
+
+
+def pending_request(status):
+    # True when a run was requested after the last run started
+    requested_at, started_at = as_utc(status.get('requested_at')), as_utc(status.get('started_at'))
+    return requested_at is not None and (started_at is None or requested_at > started_at)
+
+
+def is_due(status, interval_seconds=INGEST_INTERVAL_SECONDS, now=None):
+    # A run is due when it was never run, was requested after the last start, or the last run
+    # finished more than the interval (or the retry delay after a failure) ago. A running job
+    # is only due again once its lease has expired.
+    now = now or datetime.now(timezone.utc)
+    if status is None:
+        return True
+    if status.get('state') == RUNNING:
+        lease_until = as_utc(status.get('lease_until'))
+        return lease_until is None or lease_until < now
+    if pending_request(status):
+        return True
+    finished_at = as_utc(status.get('finished_at'))
+    if finished_at is None:
+        return True
+    wait = interval_seconds if status.get('last_result') == SUCCEEDED else min(interval_seconds, RETRY_SECONDS)
+    return finished_at + timedelta(seconds=wait) <= now
+
+
+def run_scheduler(jobs, name, job, stop_event, interval_seconds=INGEST_INTERVAL_SECONDS, poll_seconds=POLL_SECONDS):
+    # Daemon loop: poll the status document and run the job whenever it is due
+    owner = new_owner()
+    while not stop_event.is_set():
+        try:
+            if is_due(get_status(jobs, name), interval_seconds):
+                print(f"{name}: {run_job(jobs, name, job, owner)}")
+        except Exception as e:
+            print(f"{name} scheduler error: {e}")
+        stop_event.wait(poll_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run data collection on a schedule, one run at a time")
+    parser.add_argument('--interval', type=float, default=INGEST_INTERVAL_SECONDS / 3600,
+                        help="hours between scheduled runs")
+    parser.add_argument('--once', action='store_true', help="run once if due, then exit")
+    args = parser.parse_args()
+
+    # The collector (spaCy model, geocoder) is loaded once and stays warm between runs
+    from datacollection import connect, run_ingest
+
+    db = connect()
+    jobs = db[JOBS_COLLECTION_NAME]
+    interval_seconds = args.interval * 3600
+    if args.once:
+        if is_due(get_status(jobs, INGEST_JOB), interval_seconds):
+            print(run_job(jobs, INGEST_JOB, lambda: run_ingest(db)))
+        return
+    run_scheduler(jobs, INGEST_JOB, lambda: run_ingest(db), threading.Event(), interval_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+import os
+import shutil
+import threading
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+# Local, versioned copy of the cleaned disaster_info frame: <dir>/<version>/month=.../disaster_event=.../*.parquet
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshots")
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2
+MAX_PARTITIONS = 1 << 16
+# Rows are sorted by timestamp, so row-group statistics narrow a month down to the requested days
+ROWS_PER_GROUP = 16384
+
+# Month rather than day directories: per-day files would hold a few hundred rows each and a
+# full-range read would open thousands of them
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string()), ('disaster_event', pa.string())]), flavor='hive')
+
+SCHEMA = pa.schema([
+    ('title', pa.string()),
+    ('timestamp', pa.timestamp('ns', tz='UTC')),
+    ('source', pa.string()),
+    ('url', pa.string()),
+    ('Location', pa.string()),
+    ('Latitude', pa.float64()),
+    ('Longitude', pa.float64()),
+    ('month', pa.string()),
+    ('disaster_event', pa.string()),
+])
+
+# Serialises snapshot builds within one process
+build_lock = threading.Lock()
+
+
+def current_version(directory=SNAPSHOT_DIR):
+    # Version of the complete snapshot on disk, or None
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            version = int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+    return version if os.path.isdir(os.path.join(directory, str(version))) else None
+
+
+def snapshot_table(df):
+    # df as an Arrow table in SCHEMA, sorted by timestamp, with the month partition column added
+    import pandas as pd
+
+    frame = pd.DataFrame({column: df[column] if column in df.columns else None for column in SCHEMA.names
+                          if column != 'month'})
+    frame['disaster_event'] = frame['disaster_event'].astype(object)
+    frame['Location'] = frame['Location'].astype(object)
+    frame['source'] = frame['source'].astype(object)
+    frame['month'] = frame['timestamp'].dt.strftime('%Y-%m')
+    frame = frame.dropna(subset=['month', 'disaster_event']).sort_values('timestamp')
+    return pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False).combine_chunks()
+
+
+def write_partitions(table, staging):
+    ds.write_dataset(table, staging, format='parquet', partitioning=PARTITIONING,
+                     existing_data_behavior='overwrite_or_ignore', max_partitions=MAX_PARTITIONS,
+                     min_rows_per_group=ROWS_PER_GROUP, max_rows_per_group=ROWS_PER_GROUP)
+
+
+def publish(staging, version, directory):
+    # Move a complete staging directory into place, then switch CURRENT to it in one rename.
+    # Readers keep using the previous version until the switch; older versions are pruned.
+    target = os.path.join(directory, str(version))
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+    pointer = os.path.join(directory, CURRENT_FILE + ".tmp")
+    with open(pointer, "w") as f:
+        f.write(str(version))
+    os.replace(pointer, os.path.join(directory, CURRENT_FILE))
+    prune_versions(directory, keep=version)
+
+
+def new_staging(version, directory):
+    staging = os.path.join(directory, str(version)) + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    return staging
+
+
+def write_snapshot(df, version, directory=SNAPSHOT_DIR):
+    # Full snapshot of df under a new version directory
+    staging = new_staging(version, directory)
+    write_partitions(snapshot_table(df), staging)
+    publish(staging, version, directory)
+
+
+def append_snapshot(df, base, version, directory=SNAPSHOT_DIR):
+    # New version = snapshot `base` plus the rows in df (articles ingested after base).
+    # Only the month/event partitions df touches are rewritten, with df's rows replacing base rows
+    # of the same url; every other file is hard-linked from base, so the cost follows len(df).
+    # An updated article may have moved to another month or event, so the url column of the other
+    # partitions is checked too and a partition still holding one of df's urls is rewritten as well.
+    delta = snapshot_table(df)
+    touched = set(zip(delta.column('month').to_pylist(), delta.column('disaster_event').to_pylist()))
+    base_dir = os.path.join(directory, str(base))
+    dataset = ds.dataset(base_dir, schema=SCHEMA, format='parquet', partitioning=PARTITIONING)
+
+    fragments = []
+    for fragment in dataset.get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        partition = (keys.get('month'), keys.get('disaster_event'))
+        fragments.append((partition, fragment))
+        if len(delta) and partition not in touched:
+            urls = fragment.to_table(columns=['url']).column('url')
+            if pc.any(pc.is_in(urls, value_set=delta.column('url'), skip_nulls=True)).as_py():
+                touched.add(partition)
+
+    staging = new_staging(version, directory)
+    kept = []
+    for partition, fragment in fragments:
+        if partition in touched:
+            kept.append(fragment.path)
+            continue
+        path = os.path.join(staging, os.path.relpath(fragment.path, base_dir))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.link(fragment.path, path)
+        except OSError:
+            shutil.copy2(fragment.path, path)
+
+    if len(delta):
+        old = ds.dataset(kept, schema=SCHEMA, format='parquet', partitioning=PARTITIONING,
+                         partition_base_dir=base_dir).to_table() if kept else SCHEMA.empty_table()
+        replaced = pc.is_in(old.column('url'), value_set=delta.column('url'), skip_nulls=True)
+        old = old.filter(pc.invert(replaced))
+        merged = pa.concat_tables([old, delta]).sort_by('timestamp').combine_chunks()
+        write_partitions(merged, staging)
+    publish(staging, version, directory)
+
+
+def prune_versions(directory=SNAPSHOT_DIR, keep=None, count=KEEP_VERSIONS):
+    # Remove all but the newest `count` versions (never the one just written)
+    versions = sorted((int(name) for name in os.listdir(directory) if name.isdigit()), reverse=True)
+    for version in versions[count:]:
+        if version != keep:
+            shutil.rmtree(os.path.join(directory, str(version)), ignore_errors=True)
+
+
+def utc_timestamp(value):
+    import pandas as pd
+
+    value = pd.Timestamp(value)
+    return value.tz_localize('UTC') if value.tzinfo is None else value.tz_convert('UTC')
+
+
+def read_table(version, start=None, end=None, events=None, locations=None, columns=None, directory=SNAPSHOT_DIR):
+    # Memory-mapped read of the requested columns as an Arrow table; whole month/event partitions
+    # are skipped by path and row groups outside the window by their timestamp statistics
+    dataset = ds.dataset(os.path.join(directory, str(version)), schema=SCHEMA, format='parquet',
+                         partitioning=PARTITIONING, filesystem=pafs.LocalFileSystem(use_mmap=True))
+    conditions = []
+    if start is not None:
+        start = utc_timestamp(start)
+        conditions += [ds.field('month') >= start.strftime('%Y-%m'),
+                       ds.field('timestamp') >= pa.scalar(start, type=SCHEMA.field('timestamp').type)]
+    if end is not None:
+        end = utc_timestamp(end)
+        conditions += [ds.field('month') <= end.strftime('%Y-%m'),
+                       ds.field('timestamp') <= pa.scalar(end, type=SCHEMA.field('timestamp').type)]
+    if events is not None:
+        conditions.append(ds.field('disaster_event').isin(list(events)))
+    if locations is not None:
+        conditions.append(ds.field('Location').isin(list(locations)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    names = [column for column in (columns or SCHEMA.names) if column != 'month']
+    return dataset.to_table(columns=names, filter=expression)
+
+
+def read_snapshot(version, start=None, end=None, events=None, locations=None, columns=None, directory=SNAPSHOT_DIR):
+    return read_table(version, start, end, events, locations, columns, directory).to_pandas()
+
+
+def read_bounds(version, directory=SNAPSHOT_DIR):
+    # Oldest and newest timestamps plus the event types, from two columns of the snapshot
+    import pandas as pd
+
+    table = read_table(version, columns=['timestamp', 'disaster_event'], directory=directory)
+    bounds = pc.min_max(table.column('timestamp'))
+    min_timestamp, max_timestamp = (pd.Timestamp(bounds[key].as_py()) if bounds[key].is_valid else pd.NaT
+                                    for key in ('min', 'max'))
+    return min_timestamp, max_timestamp, sorted(pc.unique(table.column('disaster_event')).drop_null().to_pylist())
+
+
+def read_options(version, directory=SNAPSHOT_DIR):
+    # Event types and locations of the snapshot rows that have coordinates
+    table = read_table(version, columns=['disaster_event', 'Location', 'Latitude', 'Longitude'], directory=directory)
+    table = table.filter(pc.and_(pc.is_valid(table.column('Latitude')), pc.is_valid(table.column('Longitude'))))
+    return tuple(sorted(pc.unique(table.column(column)).drop_null().to_pylist())
+                 for column in ('disaster_event', 'Location'))
@@ -0,0 +1,100 @@
+import math
+import numpy as np
+
+# Mean Earth radius used for distances
+EARTH_RADIUS_KM = 6371.0088
+
+# Grid cell size of GridIndex; 0.5 degrees is about 55 km north-south
+CELL_DEGREES = 0.5
+
+
+def normalize_lon(lon):
+    # Longitudes into [-180, 180)
+    return (np.asarray(lon, dtype=float) + 180.0) % 360.0 - 180.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def lon_ranges(west, east):
+    # [(west, east), ...] with west <= east; a box crossing the antimeridian becomes two ranges
+    if east - west >= 360:
+        return [(-180.0, 180.0)]
+    west, east = float(normalize_lon(west)), float(normalize_lon(east))
+    if east == -180.0:
+        east = 180.0
+    return [(west, east)] if west <= east else [(west, 180.0), (-180.0, east)]
+
+
+def radius_bbox(lat, lon, radius_km):
+    # (south, west, north, east) around a circle; the full longitude range when it covers a pole
+    angle = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angle)
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    cos_lat = math.cos(math.radians(lat))
+    if south <= -90.0 or north >= 90.0 or angle >= math.pi / 2 or math.sin(angle) >= cos_lat:
+        return south, -180.0, north, 180.0
+    dlon = math.degrees(math.asin(math.sin(angle) / cos_lat))
+    return south, lon - dlon, north, lon + dlon
+
+
+class GridIndex:
+    # In-memory spatial index over lat/lon arrays. Points are sorted by grid cell (row-major,
+    # CELL_DEGREES cells), so each row of cells a query touches is one contiguous slice of the
+    # sorted arrays; only those candidates are checked exactly. Queries return the positions of
+    # the matching points in the input arrays, in ascending order. NaN points are never returned.
+    def __init__(self, lat, lon, cell_degrees=CELL_DEGREES):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        valid = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon))
+        self.cell_degrees = cell_degrees
+        self.rows = int(math.ceil(180 / cell_degrees))
+        self.cols = int(math.ceil(360 / cell_degrees))
+
+        cells = self.row_of(lat[valid]) * self.cols + self.col_of(normalize_lon(lon[valid]))
+        order = np.argsort(cells, kind='stable')
+        self.positions = valid[order]
+        self.lat = lat[self.positions]
+        self.lon = normalize_lon(lon[self.positions])
+        counts = np.bincount(cells, minlength=self.rows * self.cols)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def __len__(self):
+        return len(self.positions)
+
+    def row_of(self, lat):
+        return np.clip(np.floor((np.asarray(lat) + 90.0) / self.cell_degrees).astype(np.int64), 0, self.rows - 1)
+
+    def col_of(self, lon):
+        return np.clip(np.floor((np.asarray(lon) + 180.0) / self.cell_degrees).astype(np.int64), 0, self.cols - 1)
+
+    def candidates(self, south, north, ranges):
+        # Indexes into the sorted arrays of every point in the cells covering the box
+        rows = np.arange(self.row_of(south), self.row_of(north) + 1) * self.cols
+        starts, ends = [], []
+        for west, east in ranges:
+            starts.append(self.offsets[rows + self.col_of(west)])
+            ends.append(self.offsets[rows + self.col_of(east) + 1])
+        starts, ends = np.concatenate(starts), np.concatenate(ends)
+        lengths = ends - starts
+        # arange over every slice at once: each slice's start, shifted by where it lands in the output
+        return np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+
+    def bbox(self, south, west, north, east):
+        # Points with south <= lat <= north inside the west..east longitude span (may cross 180)
+        ranges = lon_ranges(west, east)
+        found = self.candidates(south, north, ranges)
+        lat, lon = self.lat[found], self.lon[found]
+        inside = (lat >= south) & (lat <= north)
+        inside &= np.logical_or.reduce([(lon >= low) & (lon <= high) for low, high in ranges])
+        return np.sort(self.positions[found[inside]])
+
+    def radius(self, lat, lon, radius_km):
+        # Points within radius_km (great-circle distance) of lat/lon
+        south, west, north, east = radius_bbox(lat, lon, radius_km)
+        found = self.candidates(south, north, lon_ranges(west, east))
+        inside = haversine_km(lat, lon, self.lat[found], self.lon[found]) <= radius_km
+        return np.sort(self.positions[found[inside]])
@@ -0,0 +1,12 @@
+import os
+import sys
+import mongomock
+import pytest
+
+# The modules under test live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()['GeoNews']
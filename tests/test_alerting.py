@@ -0,0 +1,129 @@
+from datetime import datetime, timezone
+import pytest
+from alerting import WATERMARK_FIELD, dispatch_alerts, get_alert_watermark
+
+
+class Outbox:
+    # send() stand-in recording deliveries; addresses in `failing` raise like an SMTP/Mongo failure
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.sent = []
+
+    def __call__(self, email, events):
+        if email in self.failing:
+            raise OSError(f"cannot reach {email}")
+        self.sent.append((email, [event['title'] for event in events]))
+
+    def titles(self, email):
+        return [title for address, titles in self.sent if address == email for title in titles]
+
+
+PLACES = {'Paris': (48.85, 2.35), 'Versailles': (48.80, 2.13), 'London': (51.51, -0.13), 'Tokyo': (35.68, 139.69)}
+
+
+def add_event(db, title, event, location):
+    latitude, longitude = PLACES[location]
+    db.disaster_info.insert_one({'title': title, 'disaster_event': event, 'Location': location, 'url': f"https://example.com/{title}",
+                                 'timestamp': datetime(2024, 1, 1, tzinfo=timezone.utc),
+                                 'Latitude': latitude, 'Longitude': longitude})
+
+
+def subscribe(db, email, events, locations=(), near=None, radius_km=None):
+    subscription = {'email': email, 'selected_events': list(events), 'selected_locations': list(locations)}
+    if near:
+        latitude, longitude = PLACES[near]
+        subscription.update(near={'type': 'Point', 'coordinates': [longitude, latitude]}, radius_km=radius_km)
+    db.subscriptions.insert_one(subscription)
+
+
+def dispatch(db, outbox):
+    return dispatch_alerts(db.disaster_info, db.subscriptions, db.metadata, outbox)
+
+
+def test_first_dispatch_starts_at_the_oldest_subscription(db):
+    add_event(db, 'old flood', 'Flood', 'Paris')
+    subscribe(db, 'ana@example.com', ['Flood'], ['Paris'])
+    add_event(db, 'new flood', 'Flood', 'Paris')
+    outbox = Outbox()
+
+    assert dispatch(db, outbox)['sent'] == 1
+    assert outbox.sent == [('ana@example.com', ['new flood'])]
+    assert get_alert_watermark(db.metadata) == db.disaster_info.find_one({'title': 'new flood'})['_id']
+
+
+def test_first_dispatch_without_subscribers_skips_existing_events(db):
+    add_event(db, 'old flood', 'Flood', 'Paris')
+    outbox = Outbox()
+    assert dispatch(db, outbox)['events'] == 0
+
+    subscribe(db, 'ana@example.com', ['Flood'], ['Paris'])
+    add_event(db, 'new flood', 'Flood', 'Paris')
+    dispatch(db, outbox)
+    assert outbox.sent == [('ana@example.com', ['new flood'])]
+
+
+def test_delivered_events_are_not_sent_again(db):
+    subscribe(db, 'ana@example.com', ['Flood'], ['Paris'])
+    add_event(db, 'flood 1', 'Flood', 'Paris')
+    outbox = Outbox()
+    dispatch(db, outbox)
+    assert dispatch(db, outbox)['sent'] == 0
+
+    add_event(db, 'flood 2', 'Flood', 'Paris')
+    dispatch(db, outbox)
+    assert outbox.sent == [('ana@example.com', ['flood 1']), ('ana@example.com', ['flood 2'])]
+
+
+def test_failed_subscriber_is_retried_without_repeating_others(db):
+    subscribe(db, 'ana@example.com', ['Flood'], ['Paris'])
+    subscribe(db, 'ben@example.com', ['Flood'], ['Paris'])
+    add_event(db, 'flood 1', 'Flood', 'Paris')
+    outbox = Outbox(failing={'ben@example.com'})
+
+    stats = dispatch(db, outbox)
+    assert (stats['sent'], stats['failed']) == (1, 1)
+    # The alert watermark stays below the event ben did not get
+    assert get_alert_watermark(db.metadata) is None
+    assert WATERMARK_FIELD not in db.subscriptions.find_one({'email': 'ben@example.com'})
+
+    outbox.failing.clear()
+    add_event(db, 'flood 2', 'Flood', 'Paris')
+    dispatch(db, outbox)
+    assert outbox.titles('ana@example.com') == ['flood 1', 'flood 2']
+    assert outbox.titles('ben@example.com') == ['flood 1', 'flood 2']
+    assert get_alert_watermark(db.metadata) == db.disaster_info.find_one({'title': 'flood 2'})['_id']
+
+
+def test_failure_holds_the_watermark_at_the_first_undelivered_event(db):
+    subscribe(db, 'ana@example.com', ['Flood'], ['Paris'])
+    subscribe(db, 'ben@example.com', ['Storm'], ['London'])
+    add_event(db, 'flood 1', 'Flood', 'Paris')
+    add_event(db, 'storm 1', 'Storm', 'London')
+    dispatch(db, Outbox(failing={'ben@example.com'}))
+
+    assert get_alert_watermark(db.metadata) == db.disaster_info.find_one({'title': 'flood 1'})['_id']
+
+
+def test_all_matches_every_event_type_at_the_selected_locations(db):
+    subscribe(db, 'ana@example.com', ['All'], ['Paris'])
+    add_event(db, 'flood', 'Flood', 'Paris')
+    add_event(db, 'storm', 'Storm', 'Paris')
+    add_event(db, 'far storm', 'Storm', 'London')
+    outbox = Outbox()
+    dispatch(db, outbox)
+    assert outbox.sent == [('ana@example.com', ['flood', 'storm'])]
+
+
+@pytest.mark.parametrize('events, expected', [
+    (['Flood'], ['flood near']),
+    (['All'], ['flood near', 'storm near']),
+])
+def test_radius_subscriptions_get_events_within_the_radius(db, events, expected):
+    subscribe(db, 'ana@example.com', events, near='Paris', radius_km=50)
+    add_event(db, 'flood near', 'Flood', 'Versailles')
+    add_event(db, 'storm near', 'Storm', 'Paris')
+    add_event(db, 'flood far', 'Flood', 'London')
+    add_event(db, 'flood very far', 'Flood', 'Tokyo')
+    outbox = Outbox()
+    dispatch(db, outbox)
+    assert outbox.sent == [('ana@example.com', expected)]
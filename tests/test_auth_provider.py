@@ -0,0 +1,47 @@
+import pytest
+from auth_provider import AuthProvider, InMemoryAuthProvider, UsernameTakenError
+
+
+def directory(size):
+    return InMemoryAuthProvider({'uid': f"user{i}", 'email': f"user{i}@example.com"} for i in range(size))
+
+
+def sign_up(provider, email, uid):
+    # What the sign-up form does: check the name, then create the account
+    if provider.username_taken(uid):
+        raise UsernameTakenError(uid)
+    return provider.create_user(email, 'password', uid)
+
+
+def test_provider_methods_are_abstract():
+    with pytest.raises(TypeError):
+        AuthProvider()
+
+
+@pytest.mark.parametrize('size', [0, 10, 10000])
+def test_sign_up_lookups_do_not_grow_with_users(size):
+    provider = directory(size)
+    sign_up(provider, 'new@example.com', 'newcomer')
+    assert provider.lookups == 1
+
+
+def test_taken_names_are_cached():
+    provider = directory(3)
+    assert provider.username_taken('user1')
+    assert provider.username_taken('user1')
+    assert provider.lookups == 1
+
+
+def test_free_names_are_not_cached():
+    provider = directory(3)
+    assert not provider.username_taken('newcomer')
+    assert not provider.username_taken('newcomer')
+    assert provider.lookups == 2
+
+
+def test_created_names_are_taken_without_lookup():
+    provider = directory(3)
+    sign_up(provider, 'new@example.com', 'newcomer')
+    with pytest.raises(UsernameTakenError):
+        sign_up(provider, 'other@example.com', 'newcomer')
+    assert provider.lookups == 1
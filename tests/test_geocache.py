@@ -0,0 +1,150 @@
+from types import SimpleNamespace
+import pytest
+from geopy.exc import GeocoderTimedOut
+import geocache
+from geocache import GeocodeCache, TokenBucket, resolve_locations
+
+
+class FlakyGeocoder:
+    # Times out `failures` times per location before answering; None for unknown places
+    def __init__(self, places, failures=0):
+        self.places = places
+        self.failures = failures
+        self.calls = {}
+
+    def geocode(self, location, timeout=None):
+        self.calls[location] = self.calls.get(location, 0) + 1
+        if self.calls[location] <= self.failures:
+            raise GeocoderTimedOut(location)
+        if location not in self.places:
+            return None
+        latitude, longitude = self.places[location]
+        return SimpleNamespace(latitude=latitude, longitude=longitude)
+
+
+class FakeClock:
+    # Stands in for the time module inside geocache; sleep() advances the clock instead of waiting
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(geocache, 'time', clock)
+    return clock
+
+
+def test_retries_count_one_miss_per_location(tmp_path, clock):
+    geocoder = FlakyGeocoder({'Paris': (48.85, 2.35)}, failures=2)
+    cache = GeocodeCache(geocoder, path=str(tmp_path / 'geocode.sqlite3'))
+    results = resolve_locations(cache, ['Paris', 'Atlantis', 'Paris'], rate=1000)
+
+    assert results == {'Paris': (48.85, 2.35), 'Atlantis': None}
+    assert geocoder.calls == {'Paris': 3, 'Atlantis': 3}
+    assert cache.stats == {'memory_hits': 0, 'disk_hits': 0, 'misses': 2, 'negative_hits': 0}
+
+    assert resolve_locations(cache, ['Paris', 'Atlantis'], rate=1000) == results
+    assert cache.stats == {'memory_hits': 2, 'disk_hits': 0, 'misses': 2, 'negative_hits': 1}
+    cache.close()
+
+
+def test_negative_entries_expire(tmp_path, clock):
+    geocoder = FlakyGeocoder({})
+    cache = GeocodeCache(geocoder, path=str(tmp_path / 'geocode.sqlite3'), negative_ttl=60)
+    assert cache.geocode('Atlantis') is None
+    clock.now += 59
+    assert cache.geocode('Atlantis') is None
+    assert geocoder.calls == {'Atlantis': 1}
+    assert cache.stats['negative_hits'] == 1
+
+    # Found later: the expired miss goes back to the geocoder, and a hit is kept for good
+    geocoder.places['Atlantis'] = (31.0, -24.0)
+    clock.now += 1
+    assert cache.geocode('Atlantis') == (31.0, -24.0)
+    clock.now += 10 ** 9
+    assert cache.geocode('Atlantis') == (31.0, -24.0)
+    assert geocoder.calls == {'Atlantis': 2}
+    cache.close()
+
+
+def test_expired_negative_entry_on_disk_is_a_miss(tmp_path, clock):
+    path = str(tmp_path / 'geocode.sqlite3')
+    first = GeocodeCache(FlakyGeocoder({}), path=path, negative_ttl=60)
+    first.geocode('Atlantis')
+    first.close()
+
+    second = GeocodeCache(FlakyGeocoder({}), path=path, negative_ttl=60)
+    assert second.get('Atlantis') == (True, None)
+    second._lru.clear()
+    clock.now += 60
+    assert second.get('Atlantis') == (False, None)
+    second.close()
+
+
+def test_lru_evicts_to_the_sqlite_layer(tmp_path, clock):
+    places = {'Paris': (48.85, 2.35), 'Rome': (41.9, 12.5), 'Oslo': (59.9, 10.75)}
+    geocoder = FlakyGeocoder(places)
+    cache = GeocodeCache(geocoder, path=str(tmp_path / 'geocode.sqlite3'), lru_size=2)
+    for location in places:
+        cache.geocode(location)
+    assert list(cache._lru) == ['rome', 'oslo']
+
+    # Evicted from memory, still answered by SQLite without the geocoder, and back in the LRU
+    assert cache.geocode('  PARIS ') == places['Paris']
+    assert list(cache._lru) == ['oslo', 'paris']
+    assert cache.geocode('Oslo') == places['Oslo']
+    assert geocoder.calls == {'Paris': 1, 'Rome': 1, 'Oslo': 1}
+    assert cache.stats == {'memory_hits': 1, 'disk_hits': 1, 'misses': 3, 'negative_hits': 0}
+    cache.close()
+
+
+def test_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'geocode.sqlite3')
+    first = GeocodeCache(FlakyGeocoder({'Paris': (48.85, 2.35)}), path=path)
+    first.geocode('Paris')
+    first.close()
+
+    geocoder = FlakyGeocoder({})
+    second = GeocodeCache(geocoder, path=path)
+    assert second.geocode('paris') == (48.85, 2.35)
+    assert geocoder.calls == {}
+    assert second.stats['disk_hits'] == 1
+    second.close()
+
+
+def test_token_bucket_throttles_to_the_rate(clock):
+    bucket = TokenBucket(rate=2.0)
+    started = clock.now
+    for _ in range(5):
+        assert bucket.acquire()
+    # The first token is free, the other four come every half second
+    assert clock.now - started == pytest.approx(2.0)
+
+
+def test_token_bucket_gives_up_at_the_timeout(clock):
+    bucket = TokenBucket(rate=0.5)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=1.5)
+    assert sum(clock.slept) == pytest.approx(1.5)
+    assert bucket.acquire(timeout=1)
+
+
+def test_resolve_locations_respects_the_rate(tmp_path, clock):
+    places = {f"Town {i}": (float(i), float(i)) for i in range(4)}
+    cache = GeocodeCache(FlakyGeocoder(places), path=str(tmp_path / 'geocode.sqlite3'))
+    started = clock.now
+    assert resolve_locations(cache, list(places), max_workers=1, rate=1.0) == places
+    assert clock.now - started == pytest.approx(3.0)
+    cache.close()
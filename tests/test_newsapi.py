@@ -0,0 +1,167 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+import requests
+import newsapi
+
+
+class StubNewsApi:
+    # Local stand-in for NEWSAPI_ENDPOINT. `responses` is consumed one entry per request:
+    # (status, headers, payload) or ('sleep', seconds); once empty, pages of `total` articles.
+    def __init__(self, total=0, responses=()):
+        self.total = total
+        self.responses = list(responses)
+        self.requests = []
+
+    def page(self, params):
+        page, size = int(params['page']), int(params['pageSize'])
+        first = (page - 1) * size
+        articles = [{'title': f"{params['q']} {i}", 'url': f"https://example.com/{params['q']}/{i}"}
+                    for i in range(first, min(first + size, self.total))]
+        return 200, {}, {'status': 'ok', 'totalResults': self.total, 'articles': articles}
+
+
+@pytest.fixture
+def stub():
+    api = StubNewsApi()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+            api.requests.append(params)
+            response = api.responses.pop(0) if api.responses else api.page(params)
+            if response[0] == 'sleep':
+                # Not time.sleep: the sleeps fixture patches the shared time module
+                threading.Event().wait(response[1])
+                response = api.page(params)
+            status, headers, payload = response
+            body = json.dumps(payload).encode()
+            try:
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except ConnectionError:
+                pass # The client timed out and hung up
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    api.endpoint = f"http://127.0.0.1:{server.server_port}/v2/everything"
+    yield api
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    # Retry delays are recorded instead of slept
+    delays = []
+    monkeypatch.setattr(newsapi.time, 'sleep', delays.append)
+    return delays
+
+
+def fetch(stub, keyword='flood', **options):
+    return newsapi.fetch_live_data(keyword, 'test-key', endpoint=stub.endpoint, **options)
+
+
+def test_follows_pages_until_total_results(stub):
+    stub.total = 250
+    articles = fetch(stub, page_size=100)
+    assert len(articles) == 250
+    assert [int(params['page']) for params in stub.requests] == [1, 2, 3]
+    assert stub.requests[0]['apiKey'] == 'test-key'
+    assert stub.requests[0]['q'] == 'flood'
+
+
+def test_stops_at_page_cap(stub):
+    stub.total = 1000
+    articles = fetch(stub, page_size=100, max_pages=2)
+    assert len(articles) == 200
+    assert len(stub.requests) == 2
+
+
+def test_error_payload_keeps_earlier_pages(stub):
+    stub.total = 300
+    stub.responses = [stub.page({'q': 'flood', 'page': 1, 'pageSize': 100}),
+                      (426, {}, {'status': 'error', 'message': 'maximumResultsReached'})]
+    assert len(fetch(stub, page_size=100)) == 100
+    assert len(stub.requests) == 2
+
+
+def test_rate_limit_waits_for_retry_after(stub, sleeps):
+    stub.total = 5
+    stub.responses = [(429, {'Retry-After': '7'}, {'status': 'error', 'message': 'rateLimited'})]
+    assert len(fetch(stub)) == 5
+    assert len(stub.requests) == 2
+    assert sleeps == [7.0]
+
+
+def test_server_errors_back_off_exponentially(stub, sleeps):
+    stub.total = 5
+    stub.responses = [(503, {}, {'status': 'error'}), (500, {}, {'status': 'error'})]
+    assert len(fetch(stub, backoff=0.5)) == 5
+    assert len(stub.requests) == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_gives_up_after_retries(stub, sleeps):
+    stub.responses = [(502, {}, {'status': 'error'})] * 3
+    assert fetch(stub, retries=2) == []
+    assert len(stub.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_read_timeout_is_retried(stub, sleeps):
+    stub.total = 5
+    stub.responses = [('sleep', 0.5)]
+    assert len(fetch(stub, timeout=(1, 0.1))) == 5
+    assert len(sleeps) == 1
+
+
+def test_timeouts_exhausting_retries_raise(stub, sleeps):
+    stub.responses = [('sleep', 0.5)] * 2
+    with pytest.raises(requests.Timeout):
+        fetch(stub, timeout=(1, 0.1), retries=1)
+
+
+def test_fetch_all_keywords_isolates_failures(stub, sleeps):
+    stub.total = 3
+    stub.responses = [('sleep', 0.5)] * 2
+    results = newsapi.fetch_all_keywords(['flood', 'storm'], 'test-key', max_workers=1, endpoint=stub.endpoint,
+                                         timeout=(1, 0.1), retries=1)
+    assert list(results) == ['flood', 'storm']
+    assert results['flood'] == []
+    assert len(results['storm']) == 3
+
+
+def test_own_session_is_closed(stub, monkeypatch):
+    sessions = []
+
+    class TrackedSession(requests.Session):
+        closed = False
+
+        def close(self):
+            self.closed = True
+            super().close()
+
+    def create_session(pool_size=1):
+        sessions.append(TrackedSession())
+        return sessions[-1]
+
+    monkeypatch.setattr(newsapi, 'create_session', create_session)
+    stub.total = 1
+    fetch(stub)
+    assert sessions[0].closed
+
+    shared = TrackedSession()
+    fetch(stub, session=shared)
+    assert not shared.closed
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from emails import ALERT, WELCOME
+from outbox import (CLAIM_LEASE_SECONDS, FAILED, MAX_ATTEMPTS, PENDING, RETRY_BACKOFF_SECONDS, SENDING, SENT,
+                    claim_due, deliver_pending, drain, enqueue_email, mark_failed)
+
+
+class FakeMailer:
+    # Records rendered messages; recipients in `failing` raise like a refused SMTP send
+    sender = 'alerts@example.com'
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.messages = []
+
+    def send(self, recipient, message):
+        if recipient in self.failing:
+            raise OSError(f"refused {recipient}")
+        self.messages.append((recipient, message))
+
+
+def event(title):
+    return {'title': title, 'disaster_event': 'Flood', 'Location': 'Paris', 'url': f"https://example.com/{title}",
+            'timestamp': datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+
+def as_utc(value):
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def test_claimed_documents_are_not_claimed_twice(db):
+    enqueue_email(db.email_outbox, 'ana@example.com', WELCOME)
+    assert len(claim_due(db.email_outbox)) == 1
+    assert claim_due(db.email_outbox) == []
+    assert db.email_outbox.find_one()['status'] == SENDING
+
+
+def test_expired_claim_is_claimed_again(db):
+    enqueue_email(db.email_outbox, 'ana@example.com', WELCOME)
+    first = claim_due(db.email_outbox)[0]['claim']
+    db.email_outbox.update_many({}, {'$set': {
+        'claimed_at': datetime.now(timezone.utc) - timedelta(seconds=CLAIM_LEASE_SECONDS + 1)}})
+    docs = claim_due(db.email_outbox)
+    assert len(docs) == 1
+    assert docs[0]['claim'] != first
+
+
+def test_batch_keeps_all_of_a_recipients_documents(db):
+    for title in ('a', 'b'):
+        enqueue_email(db.email_outbox, 'ana@example.com', ALERT, [event(title)])
+    enqueue_email(db.email_outbox, 'ben@example.com', ALERT, [event('c')])
+    docs = claim_due(db.email_outbox, batch_size=1)
+    assert sorted(doc['recipient'] for doc in docs) == ['ana@example.com', 'ana@example.com']
+
+
+def test_alerts_fold_into_one_digest_per_recipient(db):
+    enqueue_email(db.email_outbox, 'ana@example.com', ALERT, [event('a'), event('b')])
+    enqueue_email(db.email_outbox, 'ana@example.com', ALERT, [event('b'), event('c')])
+    enqueue_email(db.email_outbox, 'ana@example.com', WELCOME)
+    enqueue_email(db.email_outbox, 'ben@example.com', ALERT, [event('a')])
+    mailer = FakeMailer()
+
+    stats = deliver_pending(db.email_outbox, mailer)
+    assert stats == {'messages': 3, 'sent': 4, 'retry': 0, 'failed': 0}
+    digests = {recipient: message for recipient, message in mailer.messages if 'Disaster alert' in message}
+    assert 'Disaster alert: 3 new events' in digests['ana@example.com']
+    assert 'Disaster alert: 1 new event' in digests['ben@example.com']
+    assert db.email_outbox.count_documents({'status': SENT}) == 4
+
+
+def test_failed_send_backs_off_exponentially(db):
+    enqueue_email(db.email_outbox, 'ana@example.com', WELCOME)
+    mailer = FakeMailer(failing={'ana@example.com'})
+    for attempt in (1, 2, 3):
+        started = datetime.now(timezone.utc)
+        assert drain(db.email_outbox, mailer)['retry'] == 1
+        doc = db.email_outbox.find_one()
+        assert (doc['status'], doc['attempts']) == (PENDING, attempt)
+        delay = (as_utc(doc['next_attempt_at']) - started).total_seconds()
+        assert delay == pytest.approx(RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1), abs=1)
+        # Not due again until the backoff has passed
+        assert drain(db.email_outbox, mailer)['messages'] == 0
+        db.email_outbox.update_many({}, {'$set': {'next_attempt_at': started}})
+
+    mailer.failing.clear()
+    assert drain(db.email_outbox, mailer)['sent'] == 1
+    assert db.email_outbox.find_one()['status'] == SENT
+
+
+def test_parked_after_the_attempt_limit(db):
+    enqueue_email(db.email_outbox, 'ana@example.com', WELCOME)
+    db.email_outbox.update_many({}, {'$set': {'attempts': MAX_ATTEMPTS - 1}})
+    stats = drain(db.email_outbox, FakeMailer(failing={'ana@example.com'}))
+    assert (stats['retry'], stats['failed']) == (0, 1)
+
+    doc = db.email_outbox.find_one()
+    assert (doc['status'], doc['attempts'], doc['last_error']) == (FAILED, MAX_ATTEMPTS, 'refused ana@example.com')
+    assert 'claim' not in doc
+    db.email_outbox.update_many({}, {'$set': {'next_attempt_at': datetime.now(timezone.utc) - timedelta(days=1)}})
+    assert claim_due(db.email_outbox) == []
+
+
+def test_mark_failed_schedules_the_next_attempt(db):
+    enqueue_email(db.email_outbox, 'ana@example.com', WELCOME)
+    _id = db.email_outbox.find_one()['_id']
+    assert mark_failed(db.email_outbox, _id, 4, OSError('down')) == 'retry'
+    doc = db.email_outbox.find_one()
+    delay = (as_utc(doc['next_attempt_at']) - datetime.now(timezone.utc)).total_seconds()
+    assert delay == pytest.approx(RETRY_BACKOFF_SECONDS * 8, abs=1)
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from scheduler import (FAILED, IDLE, INGEST_INTERVAL_SECONDS, RETRY_SECONDS, RUNNING, SUCCEEDED, acquire_lease,
+                       get_status, is_due, release_lease, request_run, run_job)
+
+JOB = 'ingest'
+
+
+def test_held_lease_blocks_another_owner(db):
+    assert acquire_lease(db.jobs, JOB, 'a')
+    assert not acquire_lease(db.jobs, JOB, 'b')
+    status = get_status(db.jobs, JOB)
+    assert (status['state'], status['owner']) == (RUNNING, 'a')
+
+
+def test_expired_lease_is_taken_over(db):
+    assert acquire_lease(db.jobs, JOB, 'a')
+    db.jobs.update_one({'_id': JOB}, {'$set': {'lease_until': datetime.now(timezone.utc) - timedelta(seconds=1)}})
+    assert is_due(get_status(db.jobs, JOB))
+    assert acquire_lease(db.jobs, JOB, 'b')
+    assert get_status(db.jobs, JOB)['owner'] == 'b'
+
+
+def test_running_job_is_not_due_while_its_lease_holds(db):
+    acquire_lease(db.jobs, JOB, 'a')
+    assert not is_due(get_status(db.jobs, JOB))
+
+
+def test_run_job_records_success_and_frees_the_lease(db):
+    assert run_job(db.jobs, JOB, lambda: {'articles': 3}, owner='a') == {'articles': 3}
+    status = get_status(db.jobs, JOB)
+    assert (status['state'], status['owner'], status['lease_until']) == (IDLE, None, None)
+    assert (status['last_result'], status['stats']) == (SUCCEEDED, {'articles': 3})
+    assert not is_due(status)
+    assert acquire_lease(db.jobs, JOB, 'b')
+
+
+def test_run_job_releases_the_lease_after_an_exception(db):
+    def job():
+        raise RuntimeError('NewsAPI down')
+
+    with pytest.raises(RuntimeError):
+        run_job(db.jobs, JOB, job, owner='a')
+    status = get_status(db.jobs, JOB)
+    assert (status['state'], status['owner']) == (IDLE, None)
+    assert (status['last_result'], status['last_error']) == (FAILED, 'RuntimeError: NewsAPI down')
+    assert acquire_lease(db.jobs, JOB, 'b')
+
+
+def test_run_job_skips_while_another_owner_runs(db):
+    acquire_lease(db.jobs, JOB, 'a')
+    calls = []
+    assert run_job(db.jobs, JOB, lambda: calls.append(1), owner='b') is None
+    assert calls == []
+    assert get_status(db.jobs, JOB)['owner'] == 'a'
+
+
+def test_failed_run_is_retried_sooner_than_the_interval(db):
+    acquire_lease(db.jobs, JOB, 'a')
+    release_lease(db.jobs, JOB, 'a', FAILED, error='boom')
+    finished = get_status(db.jobs, JOB)['finished_at'].replace(tzinfo=timezone.utc)
+    assert not is_due(get_status(db.jobs, JOB), now=finished + timedelta(seconds=RETRY_SECONDS - 1))
+    assert is_due(get_status(db.jobs, JOB), now=finished + timedelta(seconds=RETRY_SECONDS))
+
+
+def test_successful_run_waits_for_the_interval(db):
+    acquire_lease(db.jobs, JOB, 'a')
+    release_lease(db.jobs, JOB, 'a', SUCCEEDED, {})
+    finished = get_status(db.jobs, JOB)['finished_at'].replace(tzinfo=timezone.utc)
+    assert not is_due(get_status(db.jobs, JOB), now=finished + timedelta(seconds=RETRY_SECONDS))
+    assert is_due(get_status(db.jobs, JOB), now=finished + timedelta(seconds=INGEST_INTERVAL_SECONDS))
+
+
+def test_request_run_forces_a_run_once(db):
+    run_job(db.jobs, JOB, lambda: {}, owner='a')
+    assert not is_due(get_status(db.jobs, JOB))
+    # Stored times have millisecond resolution; keep the request strictly after the start
+    db.jobs.update_one({'_id': JOB}, {'$set': {'started_at': datetime.now(timezone.utc) - timedelta(seconds=1)}})
+    request_run(db.jobs, JOB)
+    assert is_due(get_status(db.jobs, JOB))
+
+    run_job(db.jobs, JOB, lambda: {}, owner='a')
+    assert not is_due(get_status(db.jobs, JOB))
+
+
+def test_never_run_job_is_due(db):
+    assert is_due(get_status(db.jobs, JOB))
+    request_run(db.jobs, JOB)
+    assert acquire_lease(db.jobs, JOB, 'a')
@@ -0,0 +1,46 @@
+import pandas as pd
+from snapshot import append_snapshot, current_version, read_snapshot, write_snapshot
+
+
+def frame(rows):
+    df = pd.DataFrame(rows, columns=['title', 'timestamp', 'url', 'disaster_event'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], utc=True)
+    df['source'], df['Location'], df['Latitude'], df['Longitude'] = 'Wire', 'Paris', 48.85, 2.35
+    return df
+
+
+def urls(version, directory):
+    return sorted(read_snapshot(version, directory=directory)['url'])
+
+
+def test_append_adds_new_rows_and_links_untouched_partitions(tmp_path):
+    write_snapshot(frame([('Flood a', '2024-01-10', 'a', 'Flood'), ('Storm b', '2024-02-10', 'b', 'Storm')]),
+                   1, tmp_path)
+    append_snapshot(frame([('Flood c', '2024-01-12', 'c', 'Flood')]), 1, 2, tmp_path)
+
+    assert current_version(tmp_path) == 2
+    assert urls(2, tmp_path) == ['a', 'b', 'c']
+    linked = tmp_path / '2' / 'month=2024-02' / 'disaster_event=Storm'
+    original = tmp_path / '1' / 'month=2024-02' / 'disaster_event=Storm'
+    assert [f.stat().st_ino for f in linked.iterdir()] == [f.stat().st_ino for f in original.iterdir()]
+
+
+def test_updated_article_moves_between_partitions(tmp_path):
+    write_snapshot(frame([('Flood hits town', '2024-01-10', 'a', 'Flood'),
+                          ('Flood b', '2024-01-11', 'b', 'Flood')]), 1, tmp_path)
+    # Same url, new title, event and month: the old Flood row must not survive
+    append_snapshot(frame([('Storm hits town', '2024-02-03', 'a', 'Storm')]), 1, 2, tmp_path)
+
+    df = read_snapshot(2, directory=tmp_path)
+    assert sorted(df['url']) == ['a', 'b']
+    moved = df[df['url'] == 'a'].iloc[0]
+    assert (moved['title'], moved['disaster_event']) == ('Storm hits town', 'Storm')
+    assert moved['timestamp'] == pd.Timestamp('2024-02-03', tz='UTC')
+
+
+def test_empty_delta_keeps_rows(tmp_path):
+    write_snapshot(frame([('Flood a', '2024-01-10', 'a', 'Flood')]), 1, tmp_path)
+    append_snapshot(frame([]), 1, 2, tmp_path)
+    assert urls(2, tmp_path) == ['a']
+    assert not (tmp_path / '2.tmp').exists()
+    assert current_version(tmp_path) == 2
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from spatial import GridIndex, haversine_km, normalize_lon
+
+
+def make_points(count=5000, seed=0):
+    # Uniform points plus clusters on the poles and the antimeridian, unnormalized longitudes and NaNs
+    rng = np.random.default_rng(seed)
+    lat = np.concatenate([rng.uniform(-90, 90, count), rng.uniform(85, 90, 200), rng.uniform(-90, -85, 200),
+                          rng.uniform(-60, 60, 200), [90, -90, 0, 0, 45, 45]])
+    lon = np.concatenate([rng.uniform(-180, 180, count), rng.uniform(-180, 180, 400),
+                          rng.uniform(178, 182, 200), [0, 0, 180, -180, 540, -200]])
+    lat[rng.choice(len(lat), 50, replace=False)] = np.nan
+    lon[rng.choice(len(lon), 50, replace=False)] = np.nan
+    return lat, lon
+
+
+def brute_bbox(lat, lon, south, west, north, east):
+    lon = normalize_lon(lon)
+    inside = (lat >= south) & (lat <= north) & np.isfinite(lon)
+    if east - west < 360:
+        west, east = normalize_lon(west), normalize_lon(east)
+        if east == -180:
+            east = 180
+        inside &= ((lon >= west) & (lon <= east)) if west <= east else ((lon >= west) | (lon <= east))
+    return np.flatnonzero(inside)
+
+
+def brute_radius(lat, lon, center_lat, center_lon, radius_km):
+    with np.errstate(invalid='ignore'):
+        return np.flatnonzero(haversine_km(center_lat, center_lon, lat, lon) <= radius_km)
+
+
+POINTS = make_points()
+INDEX = GridIndex(*POINTS)
+
+
+@pytest.mark.parametrize('box', [
+    (40, -10, 55, 20),            # Europe
+    (-10, 170, 10, -170),         # across the antimeridian
+    (-10, 170, 10, 190),          # across it, written with an unnormalized east edge
+    (-90, 179.5, 90, -179.5),     # thin strip around 180
+    (80, -180, 90, 180),          # polar cap
+    (-90, -180, -85, 180),        # south polar cap
+    (-90, -180, 90, 180),         # whole world
+    (0, -200, 10, 200),           # wider than 360 degrees
+    (0, 10, 0.25, 10.25),         # inside one cell
+])
+def test_bbox_matches_brute_force(box):
+    np.testing.assert_array_equal(INDEX.bbox(*box), brute_bbox(*POINTS, *box))
+
+
+@pytest.mark.parametrize('center_lat, center_lon, radius_km', [
+    (48.85, 2.35, 50),
+    (48.85, 2.35, 2000),
+    (0, 179.9, 500),              # circle across the antimeridian
+    (-16, -179.5, 1000),
+    (89.5, 30, 200),              # circle over the north pole
+    (-88, -120, 500),             # circle over the south pole
+    (84, 0, 700),                 # wide longitude span near a pole
+    (0, 0, 20000),                # the whole sphere
+    (45, 45, 0),
+])
+def test_radius_matches_brute_force(center_lat, center_lon, radius_km):
+    np.testing.assert_array_equal(INDEX.radius(center_lat, center_lon, radius_km),
+                                  brute_radius(*POINTS, center_lat, center_lon, radius_km))
+
+
+def test_nan_points_are_never_returned():
+    lat, lon = POINTS
+    missing = np.flatnonzero(np.isnan(lat) | np.isnan(lon))
+    assert len(INDEX) == len(lat) - len(missing)
+    assert not np.isin(missing, INDEX.bbox(-90, -180, 90, 180)).any()
+    assert not np.isin(missing, INDEX.radius(0, 0, 20000)).any()
+
+
+def test_empty_index():
+    index = GridIndex([], [])
+    assert len(index.bbox(-90, -180, 90, 180)) == 0
+    assert len(index.radius(0, 0, 1000)) == 0
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+# Position of each level in the location_ner list
+LOCATION_LEVELS = ['Country', 'Region', 'City']
+
+
+def source_names(sources):
+    # NewsAPI source objects ({'id': ..., 'name': ...}) to their name
+    records = [source if isinstance(source, dict) else {} for source in sources]
+    names = pd.json_normalize(records)
+    if 'name' not in names.columns:
+        return pd.Series(np.nan, index=sources.index, dtype=object)
+    return pd.Series(names['name'].to_numpy(), index=sources.index)
+
+
+def transform_articles(df):
+    # Split location_ner into Country/Region/City and pick the most specific one as Location
+    df = df.copy()
+    df['source'] = source_names(df['source'])
+
+    for position, level in enumerate(LOCATION_LEVELS):
+        df[level] = df['location_ner'].str[position]
+
+    # Most specific level first, then take the first non-null value per row
+    df['Location'] = df[LOCATION_LEVELS[::-1]].bfill(axis=1).iloc[:, 0]
+    return df
+
+
+def join_coordinates(df, resolved):
+    # Merge {location: (lat, lon) or None} onto df as float64 Latitude/Longitude columns
+    locations = list(resolved)
+    coordinates = np.array(
+        [value if value is not None else (np.nan, np.nan) for value in resolved.values()],
+        dtype='float64'
+    ).reshape(-1, 2)
+    lookup = pd.DataFrame({
+        'Location': locations,
+        'Latitude': coordinates[:, 0],
+        'Longitude': coordinates[:, 1],
+    })
+    return df.merge(lookup, on='Location', how='left')
@@ -0,0 +1,46 @@
+import threading
+from collections import Counter
+import pandas as pd
+
+
+class WordFrequencies:
+    # Title token counts per (day, disaster_event). A filter is answered by adding up the
+    # counters it covers, so only new or changed days are ever tokenized again.
+    def __init__(self, processor=None):
+        # WordCloud's own tokenizer keeps stopwords, plurals and collocations as generate() had them
+        if processor is None:
+            from wordcloud import WordCloud
+            processor = WordCloud()
+        self.processor = processor
+        self.counts = {}
+        self.refreshed_at = None
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def update(self, df, days):
+        # Replace the counters of the given days with the titles in df (timestamp, disaster_event, title)
+        days = set(pd.to_datetime(list(days), utc=True))
+        counts = {key: counter for key, counter in self.counts.items() if key[0] not in days}
+
+        df = df.assign(day=df['timestamp'].dt.floor('D'))
+        df = df[df['day'].isin(days)]
+        for (day, event), titles in df.groupby(['day', 'disaster_event'], observed=True)['title']:
+            text = ' '.join(titles.dropna())
+            if text:
+                counts[(day, event)] = Counter(self.processor.process_text(text))
+
+        self.counts = counts
+        self.version += 1
+
+    def frequencies(self, start=None, end=None, events=None):
+        # Merged token counts for a date window and event types; None means "no filter"
+        total = Counter()
+        for (day, event), counter in self.counts.items():
+            if start is not None and day < start:
+                continue
+            if end is not None and day > end:
+                continue
+            if events is not None and event not in events:
+                continue
+            total.update(counter)
+        return total